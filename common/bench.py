@@ -0,0 +1,178 @@
+import json
+import platform
+from importlib import import_module
+from multiprocessing import get_context, get_all_start_methods
+from statistics import median, stdev
+from time import perf_counter
+import numpy as np
+from common.file_drawer import FileDrawer
+
+# Сравнение вариантов программы без окна Tk: каждый вариант
+# (пакет с модулем polyedr) загружает полиэдр, оптимизирует его, удаляет
+# невидимые линии и рисует изображение запоминающим холстом FileDrawer
+# (файл не записывается). Время этапов измеряется несколько раз после
+# «разогрева», а результаты сохраняются в JSON и сравниваются с базовыми.
+
+# Варианты программы в порядке их появления
+VARIANTS = ("noshadow", "shadow", "preoptimize", "optimize_1",
+            "optimize_2", "optimize_3", "optimize_4", "optimize_5",
+            "optimize_6", "optimize_7")
+# Полиэдры из каталога data
+MODELS = ("ccc", "cube", "box", "king", "cow", "babem")
+# Этапы работы (у вариантов без оптимизации или без отдельного удаления
+# невидимых линий соответствующих этапов нет; вариант shadow удаляет
+# невидимые линии при рисовании)
+STAGES = ("load", "optimize", "shadow", "draw")
+# Шаблон имени файла полиэдра
+DATA = "data/{}.geom"
+# Медиана, превышающая базовую больше чем в 1 + TOLERANCE раз, считается
+# регрессией, если разница к тому же больше NOISE секунд (иначе быстрые
+# этапы давали бы ложные срабатывания из-за шума измерений)
+TOLERANCE = 0.25
+NOISE = 0.005
+
+
+# Время этапов одного прогона варианта variant на полиэдре model: словарь
+# {этап: секунды}
+def measure(variant, model, data=DATA):
+    polyedr = import_module(f"{variant}.polyedr").Polyedr
+    times = {}
+    start = perf_counter()
+    poly = polyedr(data.format(model))
+    times["load"] = perf_counter() - start
+    if hasattr(poly, "optimize"):
+        start = perf_counter()
+        poly.optimize()
+        times["optimize"] = perf_counter() - start
+    if hasattr(poly, "shadow"):
+        start = perf_counter()
+        poly.shadow()
+        times["shadow"] = perf_counter() - start
+    tk = FileDrawer("bench.svg")
+    start = perf_counter()
+    poly.draw(tk)
+    times["draw"] = perf_counter() - start
+    return times
+
+
+# Прогон в отдельном процессе, прерываемый через limit секунд: время
+# этапов или None, если прогон не уложился в срок. Без порождения
+# процессов методом "fork" прогон выполняется в текущем процессе без
+# ограничения времени.
+def measure_limited(variant, model, limit, data=DATA):
+    if limit is None or "fork" not in get_all_start_methods():
+        return measure(variant, model, data)
+    context = get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=_child,
+                            args=(sender, variant, model, data))
+    child.start()
+    sender.close()
+    try:
+        if not receiver.poll(limit):
+            return None
+        return receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"прогон {variant} на '{model}' завершился "
+                           f"с ошибкой") from None
+    finally:
+        child.terminate()
+        child.join()
+        receiver.close()
+
+
+# Тело процесса, выполняющего прогон
+def _child(sender, variant, model, data):
+    sender.send(measure(variant, model, data))
+    sender.close()
+
+
+# Измерения вариантов variants на полиэдрах models: warmup прогонов
+# «разогрева» (создающих, в частности, откомпилированные файлы
+# полиэдров) не учитываются, затем выполняется repeat прогонов. Прогон,
+# не уложившийся в limit секунд, прерывается, и дальнейшие прогоны этого
+# варианта на этом полиэдре не выполняются. Функция report вызывается
+# после каждой пары (вариант, полиэдр).
+def bench(variants=VARIANTS, models=MODELS, repeat=5, warmup=1,
+          limit=None, data=DATA, report=None):
+    results = {}
+    for variant in variants:
+        import_module(f"{variant}.polyedr")
+        for model in models:
+            runs = []
+            for k in range(warmup + repeat):
+                times = measure_limited(variant, model, limit, data)
+                if times is None:
+                    break
+                if k >= warmup:
+                    runs.append(times)
+            entry = summary(runs)
+            entry["runs"] = len(runs)
+            entry["timeout"] = len(runs) < repeat
+            results.setdefault(variant, {})[model] = entry
+            if report is not None:
+                report(variant, model, entry)
+    return {"environment": environment(), "repeat": repeat,
+            "warmup": warmup, "limit": limit, "results": results}
+
+
+# Медианы и стандартные отклонения времени этапов (и их суммы) по
+# прогонам runs: словарь {этап: {"median": ..., "stdev": ..., "times":
+# [...]}}
+def summary(runs):
+    entry = {}
+    stages = [s for s in STAGES if runs and s in runs[0]]
+    for stage in stages + ["total"]:
+        if stage == "total":
+            times = [sum(r[s] for s in stages) for r in runs]
+        else:
+            times = [r[stage] for r in runs]
+        if times:
+            entry[stage] = {
+                "median": median(times),
+                "stdev": stdev(times) if len(times) > 1 else 0.0,
+                "times": times}
+    return entry
+
+
+# Описание окружения, в котором выполнялись измерения
+def environment():
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "system": platform.system()}
+
+
+# Регрессии результатов results относительно базовых baseline: список
+# кортежей (вариант, полиэдр, этап, базовая медиана, медиана); прогоны,
+# прерванные по времени, сравниваются, только если прерваны оба
+def regressions(results, baseline, tolerance=TOLERANCE, noise=NOISE):
+    found = []
+    old = baseline["results"]
+    for variant, models in results["results"].items():
+        for model, entry in models.items():
+            base = old.get(variant, {}).get(model)
+            if base is None:
+                continue
+            if entry["timeout"] and not base["timeout"]:
+                found.append((variant, model, "total",
+                              base["total"]["median"], float("inf")))
+                continue
+            for stage in STAGES + ("total",):
+                if stage not in entry or stage not in base:
+                    continue
+                a, b = base[stage]["median"], entry[stage]["median"]
+                if b > a * (1.0 + tolerance) and b - a > noise:
+                    found.append((variant, model, stage, a, b))
+    return found
+
+
+# Запись результатов в файл JSON
+def save(results, file):
+    with open(file, "w") as f:
+        json.dump(results, f, indent=1)
+        f.write("\n")
+
+
+# Чтение результатов из файла JSON
+def load(file):
+    with open(file) as f:
+        return json.load(f)
@@ -0,0 +1,94 @@
+class BVH:
+    """Иерархия охватывающих прямоугольников граней"""
+
+    # Параметры конструктора: список строк (xmin, ymin, xmax, ymax, zmax)
+    # — прямоугольников граней на плоскости Oxy и максимумов z — и
+    # наибольшее число граней в листе. Грани делятся пополам по медиане
+    # центров прямоугольников вдоль той оси, по которой центры разбросаны
+    # сильнее. Каждый узел хранит прямоугольник и максимум z своего
+    # поддерева.
+    def __init__(self, boxes, leaf=4):
+        self.boxes = [tuple(b) for b in boxes]
+        self.leaf = leaf
+        self.root = self._build(list(range(len(self.boxes))))
+
+    # Построение узла: [xmin, ymin, xmax, ymax, zmax, номера граней листа
+    # (None у внутреннего узла), дочерние узлы]
+    def _build(self, ids):
+        b = self.boxes
+        if not ids:
+            inf = float("inf")
+            return [inf, inf, -inf, -inf, -inf, [], []]
+        node = [min(b[k][0] for k in ids), min(b[k][1] for k in ids),
+                max(b[k][2] for k in ids), max(b[k][3] for k in ids),
+                max(b[k][4] for k in ids), None, []]
+        if len(ids) <= self.leaf:
+            node[5] = ids
+            return node
+        cx = [b[k][0] + b[k][2] for k in ids]
+        cy = [b[k][1] + b[k][3] for k in ids]
+        axis = 0 if max(cx) - min(cx) >= max(cy) - min(cy) else 1
+        ids = sorted(ids, key=lambda k: b[k][axis] + b[k][axis + 2])
+        half = len(ids) // 2
+        node[6] = [self._build(ids[:half]), self._build(ids[half:])]
+        return node
+
+    # Номера граней, которые могут затенить отрезок [beg, fin] (тройки
+    # координат): их прямоугольники пересекаются с проекцией отрезка на
+    # плоскость Oxy, а максимум z больше, чем у нижнего конца отрезка.
+    # Поддеревья, не удовлетворяющие этим условиям, пропускаются целиком.
+    def query(self, beg, fin):
+        x0, y0, z0 = beg
+        dx, dy = fin[0] - x0, fin[1] - y0
+        zmin = min(z0, fin[2])
+        # прямоугольник отрезка для быстрой предварительной проверки
+        xmin, xmax = min(x0, fin[0]), max(x0, fin[0])
+        ymin, ymax = min(y0, fin[1]), max(y0, fin[1])
+        found, boxes, stack = [], self.boxes, [self.root]
+        while stack:
+            node = stack.pop()
+            if node[4] <= zmin or node[0] > xmax or node[2] < xmin or \
+                    node[1] > ymax or node[3] < ymin or \
+                    not _crosses(node, x0, y0, dx, dy):
+                continue
+            if node[5] is None:
+                stack.extend(node[6])
+                continue
+            for k in node[5]:
+                b = boxes[k]
+                if b[4] > zmin and b[0] <= xmax and b[2] >= xmin and \
+                        b[1] <= ymax and b[3] >= ymin and \
+                        _crosses(b, x0, y0, dx, dy):
+                    found.append(k)
+        return found
+
+    # Число узлов иерархии
+    def __len__(self):
+        count, stack = 0, [self.root]
+        while stack:
+            count += 1
+            stack.extend(stack.pop()[6])
+        return count
+
+
+# Пересекается ли отрезок из точки (x0, y0) с направлением (dx, dy)
+# (параметр от 0 до 1) с прямоугольником box = (xmin, ymin, xmax, ymax,
+# ...)? Касание считается пересечением.
+def _crosses(box, x0, y0, dx, dy):
+    lo, hi = 0.0, 1.0
+    for p, d, bmin, bmax in ((x0, dx, box[0], box[2]),
+                             (y0, dy, box[1], box[3])):
+        if d == 0.0:
+            if p < bmin or p > bmax:
+                return False
+            continue
+        t0, t1 = (bmin - p) / d, (bmax - p) / d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > lo:
+            lo = t0
+        if t1 < hi:
+            hi = t1
+        if lo > hi:
+            return False
+    return True
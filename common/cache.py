@@ -0,0 +1,109 @@
+import os
+import json
+import numpy as np
+
+# Сигнатура и версия формата откомпилированного файла
+MAGIC = b"GEOMC\x00\x01\x00"
+# Выравнивание массивов внутри файла (в байтах)
+ALIGN = 64
+
+
+# Имя откомпилированного файла, лежащего рядом с исходным .geom
+def cache_path(file):
+    return file + "c"
+
+
+# Признаки исходного файла, при изменении которых кэш становится
+# недействительным: размер, время модификации и первая строка (коэффициент
+# гомотетии и углы Эйлера)
+def source_stamp(file):
+    st = os.stat(file)
+    with open(file) as f:
+        header = [float(x) for x in f.readline().split()]
+    return {"size": st.st_size, "mtime": st.st_mtime_ns, "header": header}
+
+
+# Запись откомпилированного файла: заголовок в формате JSON, за которым
+# следуют выровненные массивы. Файл пишется во временный и затем атомарно
+# переименовывается, так что параллельные чтения не видят его половинок.
+def save(file, stamp, arrays):
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        table[name] = {"dtype": a.dtype.str, "shape": list(a.shape),
+                       "offset": offset}
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+    head = json.dumps({"source": stamp, "arrays": table}).encode()
+    start = -(-(len(MAGIC) + 8 + len(head)) // ALIGN) * ALIGN
+    path = cache_path(file)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(head).to_bytes(8, "little"))
+            f.write(head)
+            for name, a in arrays.items():
+                f.seek(start + table[name]["offset"])
+                f.write(np.ascontiguousarray(a).tobytes())
+        os.replace(tmp, path)
+    except OSError:
+        # Невозможность записать кэш не мешает работе программы
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
+
+
+# Чтение откомпилированного файла. Массивы не копируются: они являются
+# представлениями единой отображённой в память области файла. Если кэш
+# отсутствует, повреждён или устарел, возвращается None.
+def load(file, stamp):
+    path = cache_path(file)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            size = int.from_bytes(f.read(8), "little")
+            head = json.loads(f.read(size))
+        if head["source"] != stamp:
+            return None
+        start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        arrays = {}
+        for name, t in head["arrays"].items():
+            dtype = np.dtype(t["dtype"])
+            count = int(np.prod(t["shape"], dtype=np.int64))
+            arrays[name] = np.frombuffer(
+                mm, dtype=dtype, count=count,
+                offset=start + t["offset"]).reshape(t["shape"])
+        return arrays
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# Имя файла с подобранным размером гнёзд сетки, лежащего рядом с исходным
+def step_path(file):
+    return file + ".step"
+
+
+# Запись подобранного размера гнёзд вместе с признаками исходного файла
+def save_step(file, stamp, step):
+    try:
+        with open(step_path(file), "w") as f:
+            json.dump({"source": stamp, "step": step}, f)
+    except OSError:
+        return False
+    return True
+
+
+# Чтение подобранного размера гнёзд; если файла нет, он повреждён или
+# исходный файл изменился, возвращается None
+def load_step(file, stamp):
+    try:
+        with open(step_path(file)) as f:
+            head = json.load(f)
+        if head["source"] != stamp:
+            return None
+        return float(head["step"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,272 @@
+import os
+import struct
+import zlib
+from time import perf_counter
+import numpy as np
+from common.r3 import good_points
+from common.tk_drawer import TkDrawer, SIZE, screen, screen_segments
+
+# Цвета, используемые при рисовании (имена цветов Tk)
+COLORS = {
+    "white": (255, 255, 255),
+    "black": (0, 0, 0),
+    "gray": (190, 190, 190),
+    "red": (255, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+}
+# Форматы файлов изображения
+FORMATS = ("svg", "ppm", "png")
+
+
+# Составляющие цвета, заданного именем или в виде "#rrggbb"
+def rgb(color):
+    if color in COLORS:
+        return COLORS[color]
+    if isinstance(color, str) and len(color) == 7 and color[0] == "#":
+        return tuple(int(color[k:k + 2], 16) for k in (1, 3, 5))
+    raise ValueError(f"неизвестный цвет: {color}")
+
+
+# Цвет в виде "#rrggbb" (имена цветов SVG и Tk не всегда совпадают)
+def hex_color(color):
+    return "#%02x%02x%02x" % rgb(color)
+
+
+class Scene:
+    """Холст, запоминающий элементы изображения"""
+
+    # Элементы хранятся в порядке рисования списками [вид, стиль, строки
+    # координат]: подряд идущие элементы одного вида и стиля объединяются,
+    # так что отрезки, нарисованные по одному, хранятся так же компактно,
+    # как и нарисованные массивом
+    def __init__(self):
+        self.items = []
+
+    # Добавление строк координат rows (массив или список строк) элементов
+    # вида kind со стилем style
+    def add(self, kind, style, rows):
+        if self.items and self.items[-1][0] == kind and \
+                self.items[-1][1] == style:
+            self.items[-1][2].append(rows)
+        else:
+            self.items.append([kind, style, [rows]])
+
+    # Ломаная (как у Canvas.create_line): координаты x0, y0, x1, y1, ...
+    # её вершин; запоминаются её звенья
+    def create_line(self, *coords, fill="black", width=1, dash=None):
+        xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.add("line", (fill, width, dash),
+                 np.column_stack((xy[:-1], xy[1:])))
+
+    # Эллипс, вписанный в прямоугольник (как у Canvas.create_oval)
+    def create_oval(self, x0, y0, x1, y1, fill="black", outline=None):
+        self.add("oval", (fill,), [(x0, y0, x1, y1)])
+
+    # Прямоугольник (как у Canvas.create_rectangle); прямоугольник,
+    # закрывающий весь холст, стирает всё нарисованное ранее
+    def create_rectangle(self, x0, y0, x1, y1, fill="white"):
+        if x0 <= 0 and y0 <= 0 and x1 >= SIZE and y1 >= SIZE:
+            self.items = []
+        self.add("rectangle", (fill,), [(x0, y0, x1, y1)])
+
+    # Элементы в виде троек (вид, стиль, массив строк координат)
+    def arrays(self):
+        for kind, style, parts in self.items:
+            yield kind, style, np.concatenate([
+                np.asarray(p, dtype=np.float64).reshape(-1, 4)
+                for p in parts])
+
+
+class FileDrawer(TkDrawer):
+    """Изображение проекции полиэдра в файле"""
+
+    # Параметры конструктора: имя файла, формат которого (SVG, PPM или
+    # PNG) определяется расширением. Окно не создаётся: методы рисования
+    # TkDrawer работают с запоминающим холстом, а файл записывается целиком
+    # методом flush (или close).
+    def __init__(self, file):
+        self.file = file
+        self.format = os.path.splitext(file)[1][1:].lower()
+        if self.format not in FORMATS:
+            raise ValueError(f"неизвестный формат изображения: {file}")
+        self.root = None
+        self.canvas = Scene()
+        self.updated = perf_counter()
+
+    # Завершение работы: запись файла
+    def close(self):
+        self.flush()
+
+    # Стирание существующей картинки (файл при этом не записывается)
+    def clean(self):
+        self.canvas.create_rectangle(0, 0, SIZE, SIZE, fill="white")
+
+    # Окна нет, и обновлять нечего
+    def refresh(self):
+        pass
+
+    # Запись изображения в файл одной операцией
+    def flush(self):
+        if self.format == "svg":
+            data = svg(self.canvas).encode()
+        else:
+            image = raster(self.canvas)
+            data = ppm(image) if self.format == "ppm" else png(image)
+        with open(self.file, "wb") as f:
+            f.write(data)
+        self.updated = perf_counter()
+
+    # Рисование отрезков массивом: все они запоминаются сразу
+    def draw_lines(self, segments, line_color="black", line_width=2,
+                   dash=None):
+        if dash:
+            line_color = "gray"
+        self.canvas.add("line", (line_color, line_width, dash),
+                        screen_segments(segments))
+
+    # Рисование ломаных: запоминаются сразу все их звенья
+    def draw_polylines(self, polylines, line_color="black", line_width=2,
+                       dash=None):
+        parts = [np.stack((p[:-1], p[1:]), axis=1) for p in polylines]
+        if parts:
+            self.draw_lines(np.concatenate(parts), line_color, line_width,
+                            dash)
+
+    # Рисование точек массивом (цвета те же, что и у draw_point)
+    def draw_points(self, points, alpha, beta, gamma, c=1.0, point_size=5):
+        if not isinstance(points, np.ndarray):
+            points = np.array([(p.x, p.y, p.z) for p in points],
+                              dtype=np.float64).reshape(-1, 3)
+        good = good_points(points, alpha, beta, gamma, c)
+        xy = screen(points)
+        boxes = np.column_stack((xy - point_size, xy + point_size))
+        for flag, color in ((True, "red"), (False, "blue")):
+            # порядок точек разных цветов не важен: они одного размера
+            self.canvas.add("oval", (color,), boxes[good == flag])
+
+
+# Текст изображения в формате SVG
+def svg(scene):
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" '
+           f'height="{SIZE}" viewBox="0 0 {SIZE} {SIZE}">']
+    for kind, style, rows in scene.arrays():
+        if kind == "line":
+            color, width, dash = style
+            dash = ' stroke-dasharray="%s"' % " ".join(
+                str(d) for d in dash) if dash else ""
+            out.append(f'<g stroke="{hex_color(color)}" '
+                       f'stroke-width="{width}"{dash}>')
+            out.extend('<line x1="%.2f" y1="%.2f" x2="%.2f" y2="%.2f"/>' %
+                       tuple(r) for r in rows.tolist())
+        elif kind == "oval":
+            out.append(f'<g fill="{hex_color(style[0])}">')
+            out.extend('<ellipse cx="%.2f" cy="%.2f" rx="%.2f" ry="%.2f"/>' %
+                       ((x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2,
+                        (y1 - y0) / 2) for x0, y0, x1, y1 in rows.tolist())
+        else:
+            out.append(f'<g fill="{hex_color(style[0])}">')
+            out.extend('<rect x="%.2f" y="%.2f" width="%.2f" height="%.2f"/>'
+                       % (x0, y0, x1 - x0, y1 - y0)
+                       for x0, y0, x1, y1 in rows.tolist())
+        out.append("</g>")
+    out.append("</svg>\n")
+    return "\n".join(out)
+
+
+# Растровое изображение SIZE×SIZE (массив строк пикселей RGB)
+def raster(scene):
+    image = np.full((SIZE, SIZE, 3), 255, dtype=np.uint8)
+    for kind, style, rows in scene.arrays():
+        if kind == "line":
+            color, width, dash = style
+            px, py = _line_pixels(rows, width, dash)
+        elif kind == "oval":
+            color = style[0]
+            px, py = _disc_pixels(rows)
+        else:
+            color = style[0]
+            px, py = _rectangle_pixels(rows)
+        inside = (px >= 0) & (px < SIZE) & (py >= 0) & (py < SIZE)
+        image[py[inside], px[inside]] = rgb(color)
+    return image
+
+
+# Пиксели отрезков rows (строки x0, y0, x1, y1) толщины width с
+# пунктиром dash (длины штрихов и промежутков): отрезки проходятся с шагом
+# не больше пикселя, а каждая точка закрашивается квадратом width×width
+def _line_pixels(rows, width, dash):
+    d = rows[:, 2:] - rows[:, :2]
+    length = np.hypot(d[:, 0], d[:, 1])
+    steps = np.ceil(np.abs(d).max(axis=1, initial=0.0)).astype(np.intp) + 1
+    owner = np.repeat(np.arange(len(rows)), steps)
+    first = np.cumsum(steps) - steps
+    t = (np.arange(len(owner)) - first[owner]) / \
+        np.maximum(steps - 1, 1)[owner]
+    if dash:
+        # штрих длины dash[0], затем промежуток до конца периода
+        period = sum(dash) if len(dash) > 1 else 2 * dash[0]
+        keep = (t * length[owner]) % period < dash[0]
+        owner, t = owner[keep], t[keep]
+    x = rows[owner, 0] + t * d[owner, 0]
+    y = rows[owner, 1] + t * d[owner, 1]
+    offsets = np.arange(width) - (width - 1) // 2
+    px = np.floor(x).astype(np.intp)[:, None, None] + offsets[None, None, :]
+    py = np.floor(y).astype(np.intp)[:, None, None] + offsets[None, :, None]
+    px, py = np.broadcast_arrays(px, py)
+    return px.ravel(), py.ravel()
+
+
+# Пиксели кругов, вписанных в квадраты rows (строки x0, y0, x1, y1)
+def _disc_pixels(rows):
+    px, py = [], []
+    cx, cy = (rows[:, 0] + rows[:, 2]) / 2, (rows[:, 1] + rows[:, 3]) / 2
+    r = (rows[:, 2] - rows[:, 0]) / 2
+    # круги одного радиуса закрашиваются одним набором смещений
+    for radius in np.unique(r).tolist():
+        k = int(np.ceil(radius))
+        dx, dy = np.meshgrid(np.arange(-k, k + 1), np.arange(-k, k + 1))
+        disc = dx ** 2 + dy ** 2 <= radius ** 2
+        dx, dy = dx[disc], dy[disc]
+        same = r == radius
+        px.append((np.floor(cx[same]).astype(np.intp)[:, None] +
+                   dx).ravel())
+        py.append((np.floor(cy[same]).astype(np.intp)[:, None] +
+                   dy).ravel())
+    if not px:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(px), np.concatenate(py)
+
+
+# Пиксели прямоугольников rows (строки x0, y0, x1, y1)
+def _rectangle_pixels(rows):
+    px, py = [], []
+    for x0, y0, x1, y1 in rows.tolist():
+        x0, x1 = max(int(x0), 0), min(int(x1), SIZE)
+        y0, y1 = max(int(y0), 0), min(int(y1), SIZE)
+        xs, ys = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1))
+        px.append(xs.ravel())
+        py.append(ys.ravel())
+    return np.concatenate(px), np.concatenate(py)
+
+
+# Изображение в формате PPM (двоичный вариант P6)
+def ppm(image):
+    h, w = image.shape[:2]
+    return b"P6\n%d %d\n255\n" % (w, h) + image.tobytes()
+
+
+# Изображение в формате PNG (8 бит на составляющую цвета, без фильтров)
+def png(image):
+    h, w = image.shape[:2]
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + \
+            struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = np.zeros((h, 1 + 3 * w), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(h, 3 * w)
+    return b"\x89PNG\r\n\x1a\n" + \
+        chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)) + \
+        chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) + \
+        chunk(b"IEND", b"")
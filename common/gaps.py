@@ -0,0 +1,35 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+# «Просветы» ребра хранятся плоским упорядоченным массивом чисел
+# [b0, f0, b1, f1, ...], в котором отрезки [bk, fk] невырождены и не
+# пересекаются. Такой массив компактен и изменяется на месте.
+
+
+# Массив из одного отрезка [beg, fin]
+def full(beg=0.0, fin=1.0):
+    return array("d", (beg, fin))
+
+
+# Вычитание невырожденного отрезка [beg, fin] из «просветов» gaps на месте
+def subtract(gaps, beg, fin):
+    i, j = bisect_right(gaps, beg), bisect_left(gaps, fin)
+    ends = []
+    # начало тени попало внутрь «просвета»: он заканчивается на beg
+    if i % 2:
+        if gaps[i - 1] == beg:
+            i -= 1
+        else:
+            ends.append(beg)
+    # конец тени попал внутрь «просвета»: он начинается с fin
+    if j % 2:
+        if gaps[j] == fin:
+            j += 1
+        else:
+            ends.append(fin)
+    gaps[i:j] = array("d", ends)
+
+
+# Отрезки «просветов» в виде пар (начало, конец)
+def pairs(gaps):
+    return zip(gaps[::2], gaps[1::2])
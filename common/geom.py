@@ -0,0 +1,474 @@
+from math import pi
+from itertools import islice
+import numpy as np
+from common.r3 import transform_points, untransform_points
+from common import cache as geomc
+
+
+class Geom:
+    """Полиэдр, заданный массивами"""
+
+    # Параметры конструктора: коэффициент гомотетии, углы Эйлера (в
+    # радианах), координаты вершин после поворота и гомотетии (массив N×3),
+    # индексы вершин всех граней подряд и смещения граней в этом массиве
+    # (массив длины F+1); необязательные параметры — заранее вычисленные
+    # xy-прямоугольники с максимумом z и нормали граней, рёбра без
+    # дубликатов вместе со смежными гранями и координаты вершин до
+    # поворота и гомотетии, ориентация граней (см. outward)
+    def __init__(self, c, alpha, beta, gamma, points, indexes, offsets,
+                 boxes=None, normals=None, edges=None, model=None,
+                 outward=None):
+        self.c, self.alpha, self.beta, self.gamma = c, alpha, beta, gamma
+        self.points, self.indexes, self.offsets = points, indexes, offsets
+        self._boxes, self._normals, self._edges = boxes, normals, edges
+        self._areas, self._model, self._outward = None, model, outward
+
+    # Количество граней
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # Координаты вершин до поворота и гомотетии: массив N×3
+    def model(self):
+        if self._model is None:
+            self._model = untransform_points(
+                self.points, self.alpha, self.beta, self.gamma, self.c)
+        return self._model
+
+    # Тот же полиэдр при другой точке зрения, заданной коэффициентом
+    # гомотетии c и углами Эйлера (в радианах). Грани, рёбра и смежные с
+    # рёбрами грани не зависят от точки зрения и остаются общими с
+    # исходным полиэдром, а прямоугольники, нормали и площади граней
+    # вычисляются заново.
+    def view(self, c, alpha, beta, gamma):
+        return Geom(c, alpha, beta, gamma,
+                    transform_points(self.model(), alpha, beta, gamma, c),
+                    self.indexes, self.offsets, edges=self.edges(),
+                    model=self.model(), outward=self._outward)
+
+    # Упрощённый полиэдр (кластеризация вершин): вершины, попавшие в один
+    # куб сетки с ребром cell (в координатах после поворота и гомотетии),
+    # заменяются их средним. Повторяющиеся подряд вершины граней
+    # удаляются, а грани, у которых осталось меньше трёх вершин,
+    # отбрасываются. Точка зрения остаётся прежней, а ориентация граней
+    # наследуется от исходных граней: упрощённый полиэдр обычно уже не
+    # замкнут, но его «задние» рёбра по-прежнему можно отсекать.
+    def cluster(self, cell):
+        keys = np.floor(self.points / cell).astype(np.int64)
+        _, label, counts = np.unique(keys, axis=0, return_inverse=True,
+                                     return_counts=True)
+        label = label.ravel()
+        points, model = np.zeros((2, len(counts), 3))
+        np.add.at(points, label, self.points)
+        np.add.at(model, label, self.model())
+        points /= counts[:, None]
+        model /= counts[:, None]
+        indexes = label[self.indexes].astype(self.indexes.dtype)
+        prev, _ = _edge_pairs(indexes, self.offsets)
+        keep = prev != indexes
+        sizes = _facet_sums(keep.astype(np.float64), self.offsets)
+        owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        sizes_ok = sizes >= 3.0
+        keep &= sizes_ok[owner]
+        sizes = sizes[sizes_ok].astype(self.offsets.dtype)
+        offsets = np.concatenate(([0], np.cumsum(sizes))).astype(
+            self.offsets.dtype)
+        return Geom(self.c, self.alpha, self.beta, self.gamma, points,
+                    indexes[keep], offsets, model=model,
+                    outward=self.outward()[sizes_ok])
+
+    # Списки индексов вершин граней
+    def facet_indexes(self):
+        indexes, offsets = self.indexes.tolist(), self.offsets.tolist()
+        for k in range(len(offsets) - 1):
+            yield indexes[offsets[k]:offsets[k + 1]]
+
+    # Прямоугольники граней на плоскости Oxy и максимумы z:
+    # массив F×5 из строк (xmin, ymin, xmax, ymax, zmax)
+    def boxes(self):
+        if self._boxes is None:
+            p = self.points[self.indexes]
+            starts = self.offsets[:-1]
+            lo = np.minimum.reduceat(p, starts, axis=0)
+            hi = np.maximum.reduceat(p, starts, axis=0)
+            self._boxes = np.column_stack(
+                (lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1], hi[:, 2]))
+        return self._boxes
+
+    # Нормали граней, направленные в сторону вектора проектирования Oz
+    # (по первым трём вершинам каждой грани): массив F×3
+    def normals(self):
+        if self._normals is None:
+            starts, last = self.offsets[:-1], self.offsets[1:] - 1
+            p0 = self.points[self.indexes[starts]]
+            p1 = self.points[self.indexes[np.minimum(starts + 1, last)]]
+            p2 = self.points[self.indexes[np.minimum(starts + 2, last)]]
+            n = np.cross(p1 - p0, p2 - p0)
+            n[n[:, 2] < 0.0] *= -1.0
+            self._normals = n
+        return self._normals
+
+    # Центры граней (средние арифметические вершин): массив F×3. Вершины
+    # складываются по порядку, как и при вычислении центра гранью, поэтому
+    # результаты совпадают.
+    def centers(self):
+        sizes = np.diff(self.offsets)
+        sums = np.zeros((len(self), 3))
+        for k in range(sizes.max(initial=0)):
+            has = sizes > k
+            sums[has] += self.points[self.indexes[self.offsets[:-1][has] + k]]
+        return sums * (1.0 / np.maximum(sizes, 1))[:, None]
+
+    # Нормали к «вертикальным» полупространствам граней, направленные от
+    # центров граней: массив строк, соответствующих позициям массива
+    # индексов (k-я вершина грани — нормаль к стороне, соединяющей
+    # вершины k-1 и k). Вычисления те же, что и у граней с объектами R3.
+    def v_normals(self):
+        beg, fin = _edge_pairs(self.indexes, self.offsets)
+        a = self.points[beg]
+        d = self.points[fin] - a
+        # векторное произведение стороны на орт оси Oz
+        n = np.column_stack((d[:, 1] * 1.0 - d[:, 2] * 0.0,
+                             d[:, 2] * 0.0 - d[:, 0] * 1.0,
+                             d[:, 0] * 0.0 - d[:, 1] * 0.0))
+        w = a - np.repeat(self.centers(), np.diff(self.offsets), axis=0)
+        inward = n[:, 0] * w[:, 0] + n[:, 1] * w[:, 1] + n[:, 2] * w[:, 2] < 0
+        n[inward] *= -1.0
+        return n
+
+    # Площади проекций граней на плоскость Oxy (по формуле площади
+    # многоугольника через координаты вершин): массив длины F
+    def areas(self):
+        return np.abs(self.signed_areas())
+
+    # Ориентированные площади проекций граней: положительны, если вершины
+    # грани в проекции обходятся против часовой стрелки
+    def signed_areas(self):
+        if self._areas is None:
+            beg, fin = _edge_pairs(self.indexes, self.offsets)
+            p, q = self.points[beg], self.points[fin]
+            self._areas = _facet_sums(
+                p[:, 0] * q[:, 1] - q[:, 0] * p[:, 1], self.offsets) / 2.0
+        return self._areas
+
+    # Ориентация граней: массив длины F, в котором 1 или -1 у граней
+    # замкнутых и согласованно ориентированных компонент полиэдра (каждое
+    # ребро компоненты принадлежит ровно двум её граням и обходится ими в
+    # противоположных направлениях) — знак объёма компоненты, то есть
+    # направление обхода вершин, при котором нормаль внешняя, — и 0 у
+    # остальных граней. Ориентация не зависит от точки зрения.
+    def outward(self):
+        if self._outward is not None:
+            return self._outward
+        beg, fin = _edge_pairs(self.indexes, self.offsets)
+        owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        keys = edge_keys(beg, fin)
+        order = np.argsort(keys, kind="stable")
+        keys, half = keys[order], owner[order]
+        forward = beg[order] < fin[order]
+        # «полурёбра» с одинаковыми ключами идут подряд: ребро согласовано,
+        # если таких полурёбер ровно два и они противоположно направлены
+        new = np.ones(len(keys), dtype=bool)
+        new[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(new)
+        counts = np.diff(np.append(starts, len(keys)))
+        good = counts == 2
+        pair = starts[good]
+        good[good] = forward[pair] != forward[pair + 1]
+        # компоненты связности граней по согласованным рёбрам; компонента
+        # замкнута, если у её граней нет несогласованных рёбер
+        pair = starts[good]
+        label = _components(len(self), half[pair], half[pair + 1])
+        closed = np.ones(len(self), dtype=bool)
+        closed[label[half[~np.repeat(good, counts)]]] = False
+        prev, nxt = self._neighbours()
+        p = self.points[self.indexes]
+        # удвоенные ориентированные объёмы компонент (сумма объёмов
+        # тетраэдров с вершиной в начале координат)
+        cone = np.einsum("ij,ij->i", p[np.repeat(self.offsets[:-1], np.diff(
+            self.offsets))], np.cross(p, p[nxt]))
+        volume = np.zeros(len(self))
+        np.add.at(volume, label, _facet_sums(cone, self.offsets))
+        self._outward = np.where(closed[label], np.sign(volume[label]), 0.0)
+        return self._outward
+
+    # «Задние» рёбра: массив длины E (в порядке edges) признаков того, что
+    # обе смежные с ребром грани повёрнуты от наблюдателя (грани с
+    # неизвестной ориентацией, см. outward, «задними» не считаются). Луч,
+    # выпущенный из точки такого ребра замкнутой компоненты к наблюдателю,
+    # входит внутрь компоненты и где-то из неё выходит, поэтому ребро
+    # заведомо невидимо.
+    def back_edges(self):
+        owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        prev, nxt = self._neighbours()
+        p = self.points[self.indexes]
+        # внешняя нормаль «задней» грани направлена против оси Oz; чтобы
+        # не ошибиться на неплоских гранях, проекции которых могут
+        # самопересекаться, от наблюдателя должны быть повёрнуты все углы
+        # проекции грани
+        u, v = p[:, :2] - p[prev, :2], p[nxt, :2] - p[:, :2]
+        outward = self.outward()
+        turn = (u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]) * outward[owner]
+        back = (outward != 0.0) & (self.offsets[:-1] < self.offsets[1:])
+        back[owner[turn >= 0.0]] = False
+        _, facets = self.edges()
+        return back[facets[:, 0]] & (facets[:, 1] >= 0) & back[facets[:, 1]]
+
+    # Позиции предыдущей и следующей вершин в обходе грани для каждой
+    # позиции массива индексов
+    def _neighbours(self):
+        pos = np.arange(len(self.indexes))
+        prev, nxt = pos - 1, pos + 1
+        filled = self.offsets[:-1] < self.offsets[1:]
+        first = self.offsets[:-1][filled]
+        last = self.offsets[1:][filled] - 1
+        prev[first], nxt[last] = last, first
+        return prev, nxt
+
+    # Рёбра без дубликатов: массив E×2 пар индексов вершин в порядке первого
+    # появления рёбер в файле и массив E×2 номеров двух граней, которым
+    # принадлежит каждое ребро (-1 вместо второй грани, если она одна).
+    # Дубликаты находятся по упакованным парам индексов за время O(E).
+    def edges(self):
+        if self._edges is None:
+            beg, fin = _edge_pairs(self.indexes, self.offsets)
+            keys = edge_keys(beg, fin)
+            _, first, inverse = np.unique(keys, return_index=True,
+                                          return_inverse=True)
+            last = np.zeros(len(first), dtype=np.int64)
+            np.maximum.at(last, inverse, np.arange(len(keys)))
+            order = np.argsort(first)
+            first, last = first[order], last[order]
+            # номер грани для каждой позиции массива индексов
+            owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+            self._edges = (
+                np.column_stack((beg[first], fin[first])).astype(np.int32),
+                np.column_stack((owner[first], np.where(
+                    last != first, owner[last], -1))).astype(np.int32))
+        return self._edges
+
+
+# Чтение файла .geom в текстовом формате. Блоки вершин и граней
+# разбираются целиком, каждый одним вызовом преобразования текста в числа,
+# а числа вершин, граней и рёбер из второй строки файла проверяются.
+def parse(file):
+    with open(file) as f:
+        text = f.read()
+    lines = text.split("\n", 2)
+    if len(lines) < 2:
+        raise ValueError(f"{file}: нет заголовка полиэдра")
+    c, alpha, beta, gamma, nv, nf, ne = _header(lines[0], lines[1])
+    body = lines[2] if len(lines) > 2 else ""
+
+    # блок вершин занимает ровно nv строк
+    facets = body.split("\n", nv)
+    if len(facets) <= nv:
+        raise ValueError(f"{file}: ожидалось {nv} вершин")
+    facets = facets[-1]
+    points = np.fromstring(body[:len(body) - len(facets)],
+                           dtype=np.float64, sep=" ")
+    if points.size != 3 * nv:
+        raise ValueError(f"{file}: ожидалось {nv} вершин по три координаты")
+
+    # грани: количество вершин грани, за которым следуют их номера
+    indexes, offsets = _facets(facets, nv, file)
+    if len(offsets) - 1 != nf:
+        raise ValueError(f"{file}: ожидалось {nf} граней")
+    if offsets[-1] != ne:
+        raise ValueError(f"{file}: ожидалось {ne} рёбер граней")
+
+    # поворот и гомотетия всех вершин сразу
+    points = points.reshape(nv, 3)
+    return Geom(c, alpha, beta, gamma,
+                transform_points(points, alpha, beta, gamma, c),
+                indexes, offsets, model=points)
+
+
+# Разбор двух первых строк файла
+def _header(first, second):
+    # в первой строке коэффициент гомотетии и углы Эйлера
+    c, alpha, beta, gamma = (float(x) for x in first.split())
+    alpha, beta, gamma = (x * pi / 180.0 for x in (alpha, beta, gamma))
+    # во второй строке число вершин, граней и рёбер полиэдра
+    nv, nf, ne = (int(x) for x in second.split())
+    return c, alpha, beta, gamma, nv, nf, ne
+
+
+# Разбор блока граней (по грани в строке): индексы вершин всех граней
+# подряд и смещения граней в этом массиве
+def _facets(text, nv, file):
+    buf = np.fromstring(text, dtype=np.int64, sep=" ")
+    heads = _heads(text, buf)
+    if heads is None:
+        raise ValueError(f"{file}: неверный формат блока граней")
+    sizes = buf[heads]
+    mask = np.ones(len(buf), dtype=bool)
+    mask[heads] = False
+    indexes = (buf[mask] - 1).astype(np.int32)
+    if len(indexes) and (indexes.min() < 0 or indexes.max() >= nv):
+        raise ValueError(f"{file}: номер вершины вне диапазона 1..{nv}")
+    offsets = np.zeros(len(heads) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return indexes, offsets
+
+
+# Позиции чисел, задающих количество вершин граней, в массиве buf,
+# полученном из текста text блока граней (по грани в строке). Если
+# строки блока не согласуются с массивом, возвращается None.
+def _heads(text, buf):
+    b = np.frombuffer(text.encode(), dtype=np.uint8)
+    space = (b == 32) | (b == 9) | (b == 10) | (b == 13)
+    # начала чисел и номера строк, в которых они находятся
+    starts = ~space & np.concatenate(([True], space[:-1]))
+    lines = np.cumsum(b == 10)[starts]
+    if len(lines) != len(buf):
+        return None
+    # первое число каждой непустой строки
+    heads = np.flatnonzero(np.diff(lines, prepend=-1))
+    sizes = np.diff(heads, append=len(buf)) - 1
+    if np.any(buf[heads] != sizes):
+        return None
+    return heads
+
+
+# Загрузка полиэдра; при cache=True используется откомпилированный файл,
+# лежащий рядом с исходным, а при его отсутствии или устаревании он
+# создаётся заново
+def load(file, cache=True):
+    try:
+        stamp = geomc.source_stamp(file) if cache else None
+    except (OSError, ValueError):
+        stamp = None
+    if stamp is not None:
+        arrays = geomc.load(file, stamp)
+        if arrays is not None:
+            c, alpha, beta, gamma = arrays["header"].tolist()
+            edges = None
+            if "edges" in arrays and "edge_facets" in arrays:
+                edges = (arrays["edges"], arrays["edge_facets"])
+            return Geom(c, alpha, beta, gamma, arrays["points"],
+                        arrays["indexes"], arrays["offsets"],
+                        arrays.get("boxes"), arrays.get("normals"), edges,
+                        arrays.get("model"))
+    geom = parse(file)
+    if stamp is not None:
+        geomc.save(file, stamp, {
+            "header": np.array([geom.c, geom.alpha, geom.beta, geom.gamma]),
+            "points": geom.points,
+            "indexes": geom.indexes,
+            "offsets": geom.offsets,
+            "boxes": geom.boxes(),
+            "normals": geom.normals(),
+            "edges": geom.edges()[0],
+            "edge_facets": geom.edges()[1],
+            "model": geom.model(),
+        })
+    return geom
+
+
+# Рёбра граней: пары индексов вершин (k-1-я и k-я вершины грани) для всех
+# граней подряд в порядке их следования в файле
+def _edge_pairs(indexes, offsets):
+    pos = np.arange(len(indexes), dtype=np.int64)
+    prev = pos - 1
+    # у первой вершины грани предыдущей является последняя
+    starts = offsets[:-1][offsets[:-1] < offsets[1:]]
+    prev[starts] = offsets[1:][offsets[:-1] < offsets[1:]] - 1
+    return indexes[prev], indexes
+
+
+# Суммы значений values по граням, заданным смещениями offsets
+def _facet_sums(values, offsets):
+    sums = np.zeros(len(offsets) - 1)
+    filled = offsets[:-1] < offsets[1:]
+    if len(values):
+        sums[filled] = np.add.reduceat(values, offsets[:-1][filled])
+    return sums
+
+
+# Компоненты связности графа с n вершинами и рёбрами (a[k], b[k]): номер
+# компоненты каждой вершины (наименьший номер вершины в компоненте)
+def _components(n, a, b):
+    label = np.arange(n)
+    while True:
+        new = label.copy()
+        np.minimum.at(new, a, label[b])
+        np.minimum.at(new, b, label[a])
+        new = new[new]
+        if np.array_equal(new, label):
+            return label
+        label = new
+
+
+# Номера рёбер, заданных парами индексов вершин: упорядоченная пара,
+# упакованная в одно 64-битное целое
+def edge_keys(beg, fin):
+    beg, fin = np.asarray(beg, np.int64), np.asarray(fin, np.int64)
+    return (np.minimum(beg, fin) << 32) | np.maximum(beg, fin)
+
+
+class GeomStream:
+    """Потоковое чтение файла .geom"""
+
+    # Параметры конструктора: файл, задающий полиэдр, и число граней в
+    # одной порции. Конструктор читает заголовок и блок вершин, грани же
+    # читаются порциями при переборе потока.
+    def __init__(self, file, chunk=4096):
+        self.file, self.chunk = file, chunk
+        self._f = open(file)
+        try:
+            (self.c, self.alpha, self.beta, self.gamma,
+             self.nv, self.nf, self.ne) = _header(self._f.readline(),
+                                                  self._f.readline())
+            points = np.fromstring("".join(islice(self._f, self.nv)),
+                                   dtype=np.float64, sep=" ")
+            if points.size != 3 * self.nv:
+                raise ValueError(
+                    f"{file}: ожидалось {self.nv} вершин по три координаты")
+        except Exception:
+            self._f.close()
+            raise
+        # поворот и гомотетия всех вершин сразу
+        self.points = transform_points(points.reshape(self.nv, 3),
+                                       self.alpha, self.beta, self.gamma,
+                                       self.c)
+        # номера уже встреченных рёбер; только они и хранятся между
+        # порциями, поэтому память определяется числом различных рёбер
+        self.keys = {}
+
+    # Порции граней в виде объектов Geom с общим массивом вершин. У каждой
+    # порции есть номер first её первой грани и массив edges (k×2) рёбер,
+    # впервые встретившихся в этой порции.
+    def __iter__(self):
+        first = ne = 0
+        with self._f as f:
+            while True:
+                text = "".join(islice(f, self.chunk))
+                if not text:
+                    break
+                indexes, offsets = _facets(text, self.nv, self.file)
+                if len(offsets) == 1:
+                    continue
+                part = Geom(self.c, self.alpha, self.beta, self.gamma,
+                            self.points, indexes, offsets)
+                part.first, part.edges = first, self._new_edges(part)
+                first, ne = first + len(part), ne + int(offsets[-1])
+                yield part
+        if first != self.nf:
+            raise ValueError(f"{self.file}: ожидалось {self.nf} граней")
+        if ne != self.ne:
+            raise ValueError(f"{self.file}: ожидалось {self.ne} рёбер граней")
+
+    # Удаление дубликатов рёбер «на лету»
+    def _new_edges(self, part):
+        beg, fin = _edge_pairs(part.indexes, part.offsets)
+        new = []
+        for k, key in enumerate(edge_keys(beg, fin).tolist()):
+            if key not in self.keys:
+                self.keys[key] = len(self.keys)
+                new.append(k)
+        return np.column_stack((beg[new], fin[new])).astype(np.int32)
+
+
+# Потоковая загрузка полиэдра порциями по chunk граней
+def stream(file, chunk=4096):
+    return GeomStream(file, chunk)
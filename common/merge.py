@@ -0,0 +1,143 @@
+from itertools import chain
+import numpy as np
+from common.tk_drawer import SCALE, SIZE
+
+# Видимые части рёбер часто лежат на одной прямой и касаются друг друга
+# (ребро, разделённое на части, или соседние рёбра мелкой сетки граней);
+# здесь такие отрезки объединяются до рисования, а отрезки короче пикселя
+# отбрасываются. Затем отрезки с общими концами сцепляются в ломаные,
+# каждая из которых рисуется одним элементом. Расстояния измеряются в
+# пикселях экрана: пиксель — это 1 / SCALE в координатах полиэдра.
+
+# Допуск (в пикселях): отрезки, концы которых удалены от общей прямой
+# не больше чем на SNAP, считаются лежащими на ней, а промежутки между
+# отрезками на прямой короче SNAP закрываются
+SNAP = 0.5
+# Отрезки (после объединения) короче SMALLEST пикселей отбрасываются
+SMALLEST = 0.5
+# Направление, относительно которого измеряются углы наклона отрезков:
+# разрыв углов приходится на прямые, перпендикулярные ему, а не на
+# частые в изображениях горизонтальные и вертикальные прямые
+AXIS = (np.cos(1.0), np.sin(1.0))
+
+
+# Объединение отрезков segments (массив S×2×3 или S×2×2, как у
+# Polyedr.segments), лежащих на одной прямой и касающихся или
+# перекрывающихся. Возвращаются массив отрезков, число отрезков,
+# поглощённых другими, и число отброшенных коротких отрезков.
+def merge_segments(segments, snap=SNAP, smallest=SMALLEST):
+    segments = np.asarray(segments, dtype=np.float64)
+    if not len(segments):
+        return segments, 0, 0
+    # отрезки направляются вдоль AXIS, а их концы переводятся в пиксели
+    d = segments[:, 1, :2] - segments[:, 0, :2]
+    flip = d[:, 0] * AXIS[0] + d[:, 1] * AXIS[1] < 0.0
+    segments = np.where(flip[:, None, None], segments[:, ::-1], segments)
+    xy = segments[..., :2] * SCALE
+    d = xy[:, 1] - xy[:, 0]
+    angle = np.arctan2(d[:, 1] * AXIS[0] - d[:, 0] * AXIS[1],
+                       d[:, 0] * AXIS[0] + d[:, 1] * AXIS[1])
+    length = np.hypot(d[:, 0], d[:, 1])
+    line = _lines(xy, angle, snap)
+    # направление отрезков короче snap не определено: каждый из них
+    # остаётся на своей прямой
+    short = np.flatnonzero(length < snap)
+    line[short] = len(line) + np.arange(len(short))
+    line = np.unique(line, return_inverse=True)[1]
+    # проекции концов на направление самого длинного отрезка своей прямой
+    order = np.lexsort((-length, line))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = line[order[1:]] != line[order[:-1]]
+    head = np.empty_like(line)
+    head[line[order[first]]] = order[first]
+    u = d[head[line]]
+    u /= np.maximum(np.hypot(u[:, 0], u[:, 1]), 1e-300)[:, None]
+    s0 = (xy[:, 0] * u).sum(axis=1)
+    s1 = (xy[:, 1] * u).sum(axis=1)
+    lo, hi = np.minimum(s0, s1), np.maximum(s0, s1)
+    lo_end = np.where(s0 <= s1, 0, 1)
+    # объединение отрезков каждой прямой: отрезки упорядочиваются по
+    # началам, и очередной отрезок начинает новую группу, если начинается
+    # дальше (с допуском snap), чем кончаются все предыдущие; чтобы обойтись
+    # одним накопленным максимумом, прямые разносятся по числовой оси
+    order = np.lexsort((lo, line))
+    span = hi.max() - lo.min() + 2.0 * snap + 1.0
+    shift = line[order] * span
+    reach = np.maximum.accumulate(hi[order] + shift)
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = lo[order[1:]] + shift[1:] > reach[:-1] + snap
+    group = np.cumsum(new) - 1
+    starts = np.flatnonzero(new)
+    # начало группы — начало её первого отрезка, конец — самый дальний
+    # конец её отрезков
+    beg = order[starts]
+    by_hi = order[np.lexsort((hi[order], group))]
+    fin = by_hi[np.append(starts[1:], len(order)) - 1]
+    result = np.stack((segments[beg, lo_end[beg]],
+                       segments[fin, 1 - lo_end[fin]]), axis=1)
+    merged = len(segments) - len(result)
+    # отбрасывание коротких отрезков
+    d = (result[:, 1, :2] - result[:, 0, :2]) * SCALE
+    keep = np.hypot(d[:, 0], d[:, 1]) >= smallest
+    return result[keep], merged, int(np.count_nonzero(~keep))
+
+
+# Ломаные из отрезков segments (массив S×2×3 или S×2×2): список массивов
+# вершин. Концы, удалённые друг от друга меньше чем на snap пикселей,
+# считаются общими. Ломаные строятся обходом отрезков, ещё не вошедших в
+# ломаные: сначала из вершин нечётной степени (в них ломаные неизбежно
+# кончаются), затем из остальных (так обходятся циклы). Каждый отрезок
+# входит ровно в одну ломаную, так что изображение не меняется.
+def polylines(segments, snap=SNAP):
+    segments = np.asarray(segments, dtype=np.float64)
+    if not len(segments):
+        return []
+    keys = np.floor(segments[..., :2].reshape(-1, 2) * (SCALE / snap))
+    _, vertex = np.unique(keys, axis=0, return_inverse=True)
+    vertex = vertex.reshape(-1, 2).tolist()
+    # отрезки, смежные с каждой вершиной (номер отрезка и номер его конца)
+    adjacent = [[] for k in range(max(map(max, vertex)) + 1)]
+    for k, (a, b) in enumerate(vertex):
+        adjacent[a].append((k, 0))
+        adjacent[b].append((k, 1))
+    used = [False] * len(segments)
+    odd = [v for v, a in enumerate(adjacent) if len(a) % 2]
+    result = []
+    for v in chain(odd, range(len(adjacent))):
+        while adjacent[v]:
+            trail, u = [], v
+            while adjacent[u]:
+                k, end = adjacent[u].pop()
+                if used[k]:
+                    continue
+                used[k] = True
+                if not trail:
+                    trail.append(segments[k, end])
+                trail.append(segments[k, 1 - end])
+                u = vertex[k][1 - end]
+            if trail:
+                result.append(np.array(trail))
+    return result
+
+
+# Номера прямых, на которых лежат отрезки с концами xy (в пикселях) и
+# углами наклона angle к AXIS: отрезки упорядочиваются по углу, и близкие
+# углы (расхождение на всём окне не больше snap) объединяются; затем
+# отрезки с близкими углами упорядочиваются по расстоянию прямой до
+# начала координат, и близкие расстояния (не больше snap) объединяются
+def _lines(xy, angle, snap):
+    order = np.argsort(angle, kind="stable")
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = np.diff(angle[order]) > snap / SIZE
+    bunch = np.empty(len(order), dtype=np.intp)
+    bunch[order] = np.cumsum(new) - 1
+    # расстояние до начала координат вдоль нормали к AXIS, повёрнутой
+    # на угол наклона отрезка
+    a = angle + 1.0
+    offset = xy[:, 0, 1] * np.cos(a) - xy[:, 0, 0] * np.sin(a)
+    order = np.lexsort((offset, bunch))
+    new[1:] = (bunch[order[1:]] != bunch[order[:-1]]) | \
+        (np.diff(offset[order]) > snap)
+    line = np.empty(len(order), dtype=np.intp)
+    line[order] = np.cumsum(new) - 1
+    return line
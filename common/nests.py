@@ -0,0 +1,75 @@
+from math import floor
+import numpy as np
+
+# Гнёзда — квадратные клетки сетки с шагом step на плоскости Oxy. Отрезку
+# [t1, t2] соответствуют клетки с номерами от floor(t1 / step) до
+# ceil(t2 / step) включительно, а прямоугольнику — все клетки, номера
+# которых по обеим осям принадлежат таким диапазонам.
+
+
+# Гнёзда прямоугольников boxes (массив N×4 из строк (xmin, ymin, xmax,
+# ymax)): массивы номеров прямоугольников и номеров гнёзд по осям Ox, Oy
+def cells(boxes, step):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    i0 = np.floor(boxes[:, 0] / step).astype(np.int64)
+    j0 = np.floor(boxes[:, 1] / step).astype(np.int64)
+    ni = np.ceil(boxes[:, 2] / step).astype(np.int64) - i0 + 1
+    nj = np.ceil(boxes[:, 3] / step).astype(np.int64) - j0 + 1
+    count = ni * nj
+    owner = np.repeat(np.arange(len(boxes)), count)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(count) - count, count)
+    return owner, i0[owner] + local // nj[owner], j0[owner] + local % nj[owner]
+
+
+# Пары прямоугольников из двух наборов, имеющих хотя бы одно общее гнездо:
+# массивы номеров прямоугольников первого и второго наборов, упорядоченные
+# по первому номеру, а затем по второму, без повторений
+def pairs(first, second, step):
+    p, pi, pj = cells(first, step)
+    q, qi, qj = cells(second, step)
+    # номера гнёзд, упакованные в одно целое число
+    i0 = min(pi.min(initial=0), qi.min(initial=0))
+    j0 = min(pj.min(initial=0), qj.min(initial=0))
+    width = max(pj.max(initial=0), qj.max(initial=0)) - j0 + 1
+    pkey, qkey = (pi - i0) * width + (pj - j0), (qi - i0) * width + (qj - j0)
+    order = np.argsort(qkey, kind="stable")
+    q, qkey = q[order], qkey[order]
+    lo = np.searchsorted(qkey, pkey, side="left")
+    count = np.searchsorted(qkey, pkey, side="right") - lo
+    a = np.repeat(p, count)
+    b = q[np.repeat(lo - (np.cumsum(count) - count), count) +
+          np.arange(len(a))]
+    # удаление повторений пар, имеющих несколько общих гнёзд
+    size = max(len(second), 1)
+    keys = np.sort(a * size + b)
+    keys = keys[np.diff(keys, prepend=-1) != 0]
+    return keys // size, keys % size
+
+
+# Гнёзда (пары номеров по осям Ox, Oy), через которые проходит отрезок
+# из точки (x0, y0) в точку (x1, y1), в порядке их пересечения (обход
+# Amanatides — Woo): на каждом шаге пересекается та ближайшая граница
+# гнезда по оси Ox или Oy, до которой по отрезку ближе. Число шагов равно
+# числу пересекаемых границ, поэтому обход заканчивается в гнезде конца
+# отрезка даже при ошибках округления.
+def walk(x0, y0, x1, y1, step):
+    i, j = floor(x0 / step), floor(y0 / step)
+    i1, j1 = floor(x1 / step), floor(y1 / step)
+    di, dj = (1 if i1 > i else -1), (1 if j1 > j else -1)
+    ni, nj = abs(i1 - i), abs(j1 - j)
+    dx, dy = abs(x1 - x0), abs(y1 - y0)
+    # значения параметра отрезка (от 0 до 1) на ближайших границах гнёзд
+    # и приращения параметра между соседними границами
+    if ni:
+        tx = ((i + (di > 0)) * step - x0) * di / dx
+        sx = step / dx
+    if nj:
+        ty = ((j + (dj > 0)) * step - y0) * dj / dy
+        sy = step / dy
+    yield i, j
+    while ni or nj:
+        if nj == 0 or (ni and tx < ty):
+            i, tx, ni = i + di, tx + sx, ni - 1
+        else:
+            j, ty, nj = j + dj, ty + sy, nj - 1
+        yield i, j
@@ -0,0 +1,87 @@
+class QuadTree:
+    """Дерево квадрантов прямоугольников"""
+
+    # Параметры конструктора: список прямоугольников (xmin, ymin, xmax,
+    # ymax), наибольшее число прямоугольников в листе и наибольшая глубина
+    # дерева. Квадрант, в котором прямоугольников больше capacity, делится
+    # на четыре; прямоугольник опускается в дочерний квадрант, только если
+    # целиком в нём помещается, иначе остаётся в родительском. Поэтому
+    # дерево мельче там, где прямоугольники мельче и их больше.
+    def __init__(self, boxes, capacity=8, depth=16):
+        self.boxes = [tuple(b) for b in boxes]
+        self.capacity, self.depth = capacity, depth
+        ids = list(range(len(self.boxes)))
+        if ids:
+            region = (min(b[0] for b in self.boxes),
+                      min(b[1] for b in self.boxes),
+                      max(b[2] for b in self.boxes),
+                      max(b[3] for b in self.boxes))
+        else:
+            region = (0.0, 0.0, 0.0, 0.0)
+        self.root = self._build(region, ids, 0)
+
+    # Построение узла: [прямоугольник, охватывающий всё содержимое
+    # поддерева, номера прямоугольников узла, список дочерних узлов]
+    def _build(self, region, ids, level):
+        node = [_extent(self.boxes, ids), ids, []]
+        if len(ids) <= self.capacity or level >= self.depth:
+            return node
+        xmin, ymin, xmax, ymax = region
+        cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+        quadrants = ((xmin, ymin, cx, cy), (cx, ymin, xmax, cy),
+                     (xmin, cy, cx, ymax), (cx, cy, xmax, ymax))
+        parts, rest = [[], [], [], []], []
+        for k in ids:
+            b = self.boxes[k]
+            if b[2] <= cx:
+                q = 0
+            elif b[0] >= cx:
+                q = 1
+            else:
+                rest.append(k)
+                continue
+            if b[3] <= cy:
+                parts[q].append(k)
+            elif b[1] >= cy:
+                parts[q + 2].append(k)
+            else:
+                rest.append(k)
+        if len(rest) == len(ids):
+            return node
+        node[1] = rest
+        node[2] = [self._build(r, p, level + 1)
+                   for r, p in zip(quadrants, parts) if p]
+        return node
+
+    # Номера прямоугольников, пересекающихся с прямоугольником
+    # [xmin, xmax] × [ymin, ymax]
+    def query(self, xmin, ymin, xmax, ymax):
+        found, boxes, stack = [], self.boxes, [self.root]
+        while stack:
+            (x0, y0, x1, y1), ids, children = stack.pop()
+            if x0 > xmax or x1 < xmin or y0 > ymax or y1 < ymin:
+                continue
+            for k in ids:
+                b = boxes[k]
+                if b[0] <= xmax and b[2] >= xmin and \
+                        b[1] <= ymax and b[3] >= ymin:
+                    found.append(k)
+            stack.extend(children)
+        return found
+
+    # Число узлов дерева
+    def __len__(self):
+        count, stack = 0, [self.root]
+        while stack:
+            count += 1
+            stack.extend(stack.pop()[2])
+        return count
+
+
+# Прямоугольник, охватывающий прямоугольники boxes с номерами ids (для
+# пустого списка — «вывернутый» прямоугольник, не пересекающийся ни с чем)
+def _extent(boxes, ids):
+    if not ids:
+        return (float("inf"), float("inf"), float("-inf"), float("-inf"))
+    return (min(boxes[k][0] for k in ids), min(boxes[k][1] for k in ids),
+            max(boxes[k][2] for k in ids), max(boxes[k][3] for k in ids))
@@ -1,4 +1,47 @@
 from math import sin, cos, sqrt
+from functools import lru_cache
+import numpy as np
+
+
+# Матрица поворота, задаваемого углами Эйлера: сначала вокруг оси Oz на
+# угол alpha, затем вокруг оси Oy на угол beta и снова вокруг Oz на угол
+# gamma. Для одной модели матрица вычисляется лишь один раз.
+@lru_cache(maxsize=64)
+def rotation(alpha, beta, gamma):
+    ca, sa = cos(alpha), sin(alpha)
+    cb, sb = cos(beta), sin(beta)
+    cg, sg = cos(gamma), sin(gamma)
+    return (
+        (cg * cb * ca - sg * sa, -cg * cb * sa - sg * ca, cg * sb),
+        (sg * cb * ca + cg * sa, -sg * cb * sa + cg * ca, sg * sb),
+        (-sb * ca, sb * sa, cb),
+    )
+
+
+# Поворот и гомотетия массива точек N×3 одной матричной операцией
+def transform_points(points, alpha, beta, gamma, c=1.0):
+    m = np.array(rotation(alpha, beta, gamma)) * c
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3) @ m.T
+
+
+# Преобразование, обратное transform_points
+def untransform_points(points, alpha, beta, gamma, c=1.0):
+    m = np.array(rotation(alpha, beta, gamma)) * (1 / c)
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3) @ m
+
+
+# Расстояния от точек массива N×3 до плоскости axis = value, вычисляемые
+# в исходной (до поворота и гомотетии) системе координат
+def distances_to_plane(points, alpha, beta, gamma, c, value=-1.0, axis="y"):
+    if axis not in ("x", "y", "z"):
+        raise ValueError("Недопустимая ось. Используйте 'x', 'y' или 'z'")
+    points = untransform_points(points, alpha, beta, gamma, c)
+    return np.abs(points[:, "xyz".index(axis)] - value)
+
+
+# Признаки «хороших» точек массива N×3 (см. R3.is_good_point)
+def good_points(points, alpha, beta, gamma, c=1.0, distance=1.0):
+    return distances_to_plane(points, alpha, beta, gamma, c) > distance
 
 
 class R3:
@@ -48,11 +91,21 @@ class R3:
             self.x * other.y - self.y * other.x,
         )
 
+    # Умножение на матрицу (при inverse=True — на транспонированную)
+    def rotate(self, m, inverse=False):
+        if inverse:
+            m = tuple(zip(*m))
+        return R3(
+            m[0][0] * self.x + m[0][1] * self.y + m[0][2] * self.z,
+            m[1][0] * self.x + m[1][1] * self.y + m[1][2] * self.z,
+            m[2][0] * self.x + m[2][1] * self.y + m[2][2] * self.z,
+        )
+
     def transform(self, alpha, beta, gamma, c=1.0):
-        return self.rz(alpha).ry(beta).rz(gamma) * c
+        return self.rotate(rotation(alpha, beta, gamma)) * c
 
     def untransform(self, alpha, beta, gamma, c=1.0):
-        return self.rz(-gamma).ry(-beta).rz(-alpha) * (1 / c)
+        return self.rotate(rotation(alpha, beta, gamma), True) * (1 / c)
 
     def distance_to_plane(self, alpha, beta, gamma, c, value=-1.0, axis="y"):
         distance = 0.0
@@ -0,0 +1,159 @@
+import numpy as np
+
+# Тень грани на ребре — пересечение одномерных отрезков, по которым ребро
+# пересекается с полупространствами грани: «вертикальными» (по одному на
+# сторону грани) и «горизонтальным». Здесь эти полупространства всех граней
+# хранятся в массивах, так что тени ребра от множества граней находятся
+# сразу, без цикла по граням.
+
+
+class FacetBlock:
+    """Полупространства граней в виде массивов"""
+
+    # Параметры конструктора: список граней, у каждой из которых есть
+    # список вершин vertexes и методы v_normals() и h_normal(). Строка k
+    # массивов описывает k-ю грань: столбцы соответствуют «вертикальным»
+    # полупространствам, а последний заполненный — «горизонтальному».
+    # Короткие строки дополняются полупространствами, содержащими всё
+    # пространство (нулевая нормаль и сдвиг -1).
+    def __init__(self, facets):
+        width = max((len(f.vertexes) for f in facets), default=0) + 1
+        normals, anchors, bias, zmax = [], [], [], []
+        pad = [(0.0, 0.0, 0.0)]
+        for f in facets:
+            n = [(v.x, v.y, v.z) for v in f.v_normals()]
+            h = f.h_normal()
+            n.append((h.x, h.y, h.z))
+            a = [(v.x, v.y, v.z) for v in f.vertexes]
+            a.append(a[0])
+            rest = width - len(n)
+            normals.append(n + pad * rest)
+            anchors.append(a + pad * rest)
+            bias.append([0.0] * len(n) + [-1.0] * rest)
+            zmax.append(max(v.z for v in f.vertexes))
+        shape = (len(facets), width)
+        self.normals = np.array(normals, dtype=np.float64).reshape(*shape, 3)
+        self.anchors = np.array(anchors, dtype=np.float64).reshape(*shape, 3)
+        self.bias = np.array(bias, dtype=np.float64).reshape(shape)
+        self.zmax = np.array(zmax, dtype=np.float64)
+        # «вертикальные» грани (горизонтальная нормаль имеет нулевую
+        # z-компоненту) не затеняют ничего
+        last = np.array([len(f.vertexes) for f in facets], dtype=np.intp)
+        self.vertical = self.normals[np.arange(len(facets)), last, 2] == 0.0
+        # число заполненных столбцов в каждой строке
+        self.sizes = last + 1
+
+    # Количество граней
+    def __len__(self):
+        return len(self.zmax)
+
+
+# Тени ребра [beg, fin] (тройки координат) от граней блока block с
+# номерами ids: массивы начал и концов невырожденных одномерных теней (в
+# порядке номеров граней). «Низкие» грани, целиком лежащие не выше ребра,
+# и «вертикальные» грани пропускаются.
+def edge_shades(block, beg, fin, ids):
+    beg = np.asarray(beg, dtype=np.float64).reshape(1, 3)
+    fin = np.asarray(fin, dtype=np.float64).reshape(1, 3)
+    ids = np.asarray(ids, dtype=np.intp)
+    ids = ids[_active(block, beg, fin, ids)]
+    lo, hi = _shades(block, beg, fin, ids)
+    keep = lo < hi
+    return lo[keep], hi[keep]
+
+
+# Тени для пар (ребро, грань): рёбра заданы массивами начал beg и концов
+# fin (E×3), пары — массивами номеров рёбер edges и граней facets.
+# Возвращаются номера рёбер, начала и концы невырожденных теней (в
+# произвольном порядке). Пары упорядочиваются по числу вершин граней,
+# чтобы не обрабатывать лишние столбцы блока, и обрабатываются порциями
+# по chunk штук, чтобы ограничить объём памяти.
+def pair_shades(block, beg, fin, edges, facets, chunk=1 << 16):
+    active = _active(block, beg[edges], fin[edges], facets)
+    edges, facets = edges[active], facets[active]
+    order = np.argsort(block.sizes[facets], kind="stable")
+    edges, facets = edges[order], facets[order]
+    sizes = block.sizes[facets]
+    parts = [(np.empty(0, dtype=edges.dtype), np.empty(0), np.empty(0))]
+    for k in range(0, len(edges), chunk):
+        e, f = edges[k:k + chunk], facets[k:k + chunk]
+        lo, hi = _shades(block, beg[e], fin[e], f, sizes[k:k + chunk].max())
+        keep = lo < hi
+        parts.append((e[keep], lo[keep], hi[keep]))
+    return tuple(np.concatenate(a) for a in zip(*parts))
+
+
+# Грани ids, которые могут затенить рёбра [beg, fin]: не «вертикальные»
+# и не «низкие»
+def _active(block, beg, fin, ids):
+    zmax = block.zmax[ids]
+    return ~block.vertical[ids] & ((beg[..., 2] < zmax) | (fin[..., 2] < zmax))
+
+
+# Начала и концы (возможно, вырожденных) теней на рёбрах [beg, fin] (одно
+# ребро или по ребру на каждую грань) от граней ids, у которых заполнены
+# не более width первых столбцов блока
+def _shades(block, beg, fin, ids, width=None):
+    n, a = block.normals[ids, :width], block.anchors[ids, :width]
+    # значения линейных функций полупространств на обоих концах ребра (в
+    # том же порядке операций, что и R3.dot, поэтому результаты совпадают
+    # с поэлементным вычислением)
+    d = np.stack((beg, fin))[..., None, :] - a
+    f = (n[..., 0] * d[..., 0] + n[..., 1] * d[..., 1]
+         + n[..., 2] * d[..., 2]) + block.bias[ids, :width]
+    lo, hi = clip(f[0], f[1])
+    # пересечение отрезков по всем полупространствам грани
+    return lo.max(axis=-1, initial=0.0), hi.min(axis=-1, initial=1.0)
+
+
+# Отрезки [lo, hi], по которым ребро пересекается с полупространствами
+# f < 0, заданными значениями f0 и f1 линейных функций на концах ребра:
+# весь отрезок [0, 1], если оба конца внутри, пустой отрезок [1, 0], если
+# оба снаружи, и часть ребра до точки пересечения с границей иначе
+def clip(f0, f1):
+    inside0, inside1 = f0 < 0.0, f1 < 0.0
+    x = np.divide(-f0, f1 - f0, out=np.zeros_like(f0),
+                  where=inside0 != inside1)
+    lo = np.where(inside0, 0.0, np.where(inside1, x, 1.0))
+    hi = np.where(inside1, 1.0, np.where(inside0, x, 0.0))
+    return lo, hi
+
+
+# «Просветы» рёбер по их теням: номера edges рёбер, начала lo и концы hi
+# теней (в любом порядке). Тени каждого ребра упорядочиваются и
+# объединяются, а «просветы» — дополнение объединения до [0, 1].
+# Возвращаются номера затенённых рёбер shaded (по возрастанию), смещения
+# starts и массив flat концов «просветов» всех этих рёбер подряд: концы
+# «просветов» ребра shaded[k] занимают flat[starts[k]:starts[k + 1]].
+def shades_gaps(edges, lo, hi):
+    order = np.lexsort((lo, edges))
+    edges, lo, hi = edges[order], lo[order], hi[order]
+    # точные ранги значений позволяют сравнивать пары (ребро, значение)
+    # одним целым числом
+    values, rank = np.unique(np.concatenate((lo, hi)), return_inverse=True)
+    base = edges.astype(np.int64) * len(values)
+    key_lo, key_hi = base + rank[:len(lo)], base + rank[len(lo):]
+    # очередная тень начинает новый отрезок объединения, если она лежит
+    # правее всех предыдущих теней того же ребра
+    reach = np.maximum.accumulate(key_hi)
+    first = np.ones(len(lo), dtype=bool)
+    first[1:] = key_lo[1:] > reach[:-1]
+    starts = np.flatnonzero(first)
+    e, mlo = edges[starts], lo[starts]
+    mhi = np.maximum.reduceat(hi, starts) if len(starts) else hi[starts]
+    # «просвет» перед каждым отрезком объединения и после последнего
+    new = np.ones(len(e), dtype=bool)
+    new[1:] = e[1:] != e[:-1]
+    last = np.ones(len(e), dtype=bool)
+    last[:-1] = new[1:]
+    prev = np.concatenate(([0.0], mhi[:-1]))
+    ge = np.concatenate((e, e[last]))
+    gb = np.concatenate((np.where(new, 0.0, prev), mhi[last]))
+    gf = np.concatenate((mlo, np.ones(np.count_nonzero(last))))
+    order = np.lexsort((gb, ge))
+    ge, gb, gf = ge[order], gb[order], gf[order]
+    keep = gb < gf
+    ge, flat = ge[keep], np.column_stack((gb[keep], gf[keep])).ravel()
+    shaded = e[new]
+    starts = np.append(2 * np.searchsorted(ge, shaded), len(flat))
+    return shaded, starts, flat
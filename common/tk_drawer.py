@@ -1,10 +1,19 @@
 from tkinter import *
-from common.r3 import R3
+from time import perf_counter
+import numpy as np
+from common.r3 import R3, good_points
 
 # Размер окна
 SIZE = 900
 # Коэффициент гомотетии
 SCALE = 1.5
+# Наибольший промежуток времени между обновлениями окна при рисовании
+# (в секундах): обновление — полный проход цикла обработки событий Tk, и
+# делать его после каждого элемента изображения слишком дорого
+REFRESH = 0.05
+# Число элементов изображения, создаваемых между проверками времени при
+# рисовании массивами
+CHUNK = 256
 
 
 def x(p):
@@ -17,6 +26,26 @@ def y(p):
     return SIZE / 2 - SCALE * p.y
 
 
+def screen(points):
+    """экранные координаты точек: массив N×2 строк (x, y); точки задаются
+    массивом, строки которого начинаются с координат x и y, или
+    последовательностью объектов R3"""
+    if not isinstance(points, np.ndarray):
+        points = np.array([(p.x, p.y) for p in points], dtype=np.float64)
+    points = points.reshape(-1, points.shape[-1] if points.size else 2)
+    return np.column_stack((SIZE / 2 + SCALE * points[:, 0],
+                            SIZE / 2 - SCALE * points[:, 1]))
+
+
+def screen_segments(segments):
+    """экранные координаты концов отрезков: массив S×4 строк
+    (x0, y0, x1, y1); отрезки задаются массивом S×2×3 (или S×2×2) либо
+    последовательностью пар объектов R3"""
+    if not isinstance(segments, np.ndarray):
+        segments = [p for pq in segments for p in pq]
+    return screen(segments).reshape(-1, 4)
+
+
 class TkDrawer:
     """Графический интерфейс"""
 
@@ -29,6 +58,8 @@ class TkDrawer:
         self.root.bind("<Control-c>", quit)
         self.canvas = Canvas(self.root, width=SIZE, height=SIZE)
         self.canvas.pack(padx=5, pady=5)
+        # Время последнего обновления окна
+        self.updated = perf_counter()
 
     # Завершение работы
     def close(self):
@@ -37,7 +68,18 @@ class TkDrawer:
     # Стирание существующей картинки
     def clean(self):
         self.canvas.create_rectangle(0, 0, SIZE, SIZE, fill="white")
+        self.flush()
+
+    # Обновление окна, если с прошлого обновления прошло не меньше REFRESH
+    # секунд (при рисовании по элементам и массивами)
+    def refresh(self):
+        if perf_counter() - self.updated >= REFRESH:
+            self.flush()
+
+    # Обновление окна: вывод всего нарисованного
+    def flush(self):
         self.root.update()
+        self.updated = perf_counter()
 
     #Рисование линии
     def draw_line(self, p, q, line_color="black", line_width=2, dash=None):
@@ -50,7 +92,35 @@ class TkDrawer:
                                 fill=line_color,
                                 width=line_width,
                                 dash=dash)
-        self.root.update()
+        self.refresh()
+
+    # Рисование отрезков, заданных массивом S×2×3 концов или списком пар
+    # точек; элементы создаются порциями, между которыми окно обновляется
+    # не чаще одного раза за REFRESH секунд
+    def draw_lines(self, segments, line_color="black", line_width=2,
+                   dash=None):
+        if dash:
+            line_color = "gray"
+        create = self.canvas.create_line
+        xy = screen_segments(segments).tolist()
+        for k in range(0, len(xy), CHUNK):
+            for x0, y0, x1, y1 in xy[k:k + CHUNK]:
+                create(x0, y0, x1, y1, fill=line_color, width=line_width,
+                       dash=dash)
+            self.refresh()
+
+    # Рисование ломаных, заданных списком массивов K×3 (или K×2) вершин:
+    # каждая ломаная — один элемент холста
+    def draw_polylines(self, polylines, line_color="black", line_width=2,
+                       dash=None):
+        if dash:
+            line_color = "gray"
+        create = self.canvas.create_line
+        for k in range(0, len(polylines), CHUNK):
+            for line in polylines[k:k + CHUNK]:
+                create(*screen(line).ravel().tolist(), fill=line_color,
+                       width=line_width, dash=dash)
+            self.refresh()
 
     def draw_point(self, p, alpha, beta, gamma, c=1.0, point_size=5):
         # Цвета точки
@@ -69,12 +139,28 @@ class TkDrawer:
             outline=p_color,
         )
 
-        self.root.update()  # Обновляем холст
+        self.refresh()  # Обновляем холст не слишком часто
+
+    # Рисование точек, заданных массивом N×3 или списком объектов R3
+    # (цвета те же, что и у draw_point)
+    def draw_points(self, points, alpha, beta, gamma, c=1.0, point_size=5):
+        if not isinstance(points, np.ndarray):
+            points = np.array([(p.x, p.y, p.z) for p in points],
+                              dtype=np.float64).reshape(-1, 3)
+        good = good_points(points, alpha, beta, gamma, c).tolist()
+        create = self.canvas.create_oval
+        xy = screen(points).tolist()
+        for k in range(0, len(xy), CHUNK):
+            for (px, py), g in zip(xy[k:k + CHUNK], good[k:k + CHUNK]):
+                p_color = "red" if g else "blue"
+                create(px - point_size, py - point_size, px + point_size,
+                       py + point_size, fill=p_color, outline=p_color)
+            self.refresh()
 
     def draw_axes(self, alpha, beta, gamma, c=1.0, length=100, value=-1.0):
 
         def transform(p):
-            return p.rz(alpha).ry(beta).rz(gamma) * c
+            return p.transform(alpha, beta, gamma, c)
 
         origin = R3(0, 0, 0)
         x_axis = transform(R3(length, 0, 0))
@@ -108,7 +194,7 @@ class TkDrawer:
                    const=-1.0):
 
         def transform(p):
-            return p.rz(alpha).ry(beta).rz(gamma) * c
+            return p.transform(alpha, beta, gamma, c)
 
         y = const
         for x in range(-size, size + 1, step):
@@ -0,0 +1,42 @@
+import numpy as np
+from common.r3 import R3
+
+
+class VertexStore:
+    """Массив вершин полиэдра"""
+
+    # Параметры конструктора: координаты вершин (массив N×3 или
+    # последовательность троек чисел)
+    def __init__(self, points):
+        self.points = np.ascontiguousarray(
+            points, dtype=np.float64).reshape(-1, 3)
+        # Список представлений R3 строится только по требованию
+        self._r3 = None
+
+    # Количество вершин
+    def __len__(self):
+        return len(self.points)
+
+    # Вершина с индексом k в виде объекта R3
+    def __getitem__(self, k):
+        return self.r3()[k]
+
+    # Список вершин в виде объектов R3 (для «объектного» интерфейса)
+    def r3(self):
+        if self._r3 is None:
+            self._r3 = [R3(x, y, z) for x, y, z in self.points.tolist()]
+        return self._r3
+
+    # Замена координат вершин (например, при смене точки зрения): уже
+    # построенные представления R3 изменяются на месте, поэтому рёбра и
+    # грани, ссылающиеся на них, остаются действительными
+    def update(self, points):
+        self.points = np.ascontiguousarray(
+            points, dtype=np.float64).reshape(-1, 3)
+        if self._r3 is not None:
+            for v, (x, y, z) in zip(self._r3, self.points.tolist()):
+                v.x, v.y, v.z = x, y, z
+
+    # Координаты вершин с заданными индексами
+    def take(self, indexes):
+        return self.points[np.asarray(indexes, dtype=np.intp)]
@@ -1,22 +1,30 @@
-from math import pi
-from common.r3 import R3
+from common import geom
+from common.vertexes import VertexStore
 from common.tk_drawer import TkDrawer
 
 
 class Edge:
     """ Ребро полиэдра """
-    # Параметры конструктора: начало и конец ребра (точки в R3)
+    __slots__ = ("beg", "fin", "indexes")
 
-    def __init__(self, beg, fin):
+    # Параметры конструктора: начало и конец ребра (точки в R3) и индексы
+    # этих точек в массиве вершин полиэдра
+
+    def __init__(self, beg, fin, indexes=None):
         self.beg, self.fin = beg, fin
+        self.indexes = indexes
 
 
 class Facet:
     """ Грань полиэдра """
-    # Параметры конструктора: список вершин
+    __slots__ = ("vertexes", "indexes")
+
+    # Параметры конструктора: список вершин и их индексы в массиве
+    # вершин полиэдра
 
-    def __init__(self, vertexes):
+    def __init__(self, vertexes, indexes=None):
         self.vertexes = vertexes
+        self.indexes = indexes
 
 
 class Polyedr:
@@ -28,36 +36,22 @@ class Polyedr:
         # списки вершин, рёбер и граней полиэдра
         self.vertexes, self.edges, self.facets = [], [], []
 
-        # список строк файла
-        with open(file) as f:
-            for i, line in enumerate(f):
-                if i == 0:
-                    # обрабатываем первую строку; buf - вспомогательный массив
-                    buf = line.split()
-                    # коэффициент гомотетии
-                    c = float(buf.pop(0))
-                    # углы Эйлера, определяющие вращение
-                    alpha, beta, gamma = (float(x) * pi / 180.0 for x in buf)
-                elif i == 1:
-                    # во второй строке число вершин, граней и рёбер полиэдра
-                    nv, nf, ne = (int(x) for x in line.split())
-                elif i < nv + 2:
-                    # задание всех вершин полиэдра
-                    x, y, z = (float(x) for x in line.split())
-                    self.vertexes.append(R3(x, y, z).rz(
-                        alpha).ry(beta).rz(gamma) * c)
-                else:
-                    # вспомогательный массив
-                    buf = line.split()
-                    # количество вершин очередной грани
-                    size = int(buf.pop(0))
-                    # массив вершин этой грани
-                    vertexes = [self.vertexes[int(n) - 1] for n in buf]
-                    # задание рёбер грани
-                    for n in range(size):
-                        self.edges.append(Edge(vertexes[n - 1], vertexes[n]))
-                    # задание самой грани
-                    self.facets.append(Facet(vertexes))
+        # полиэдр в виде массивов (при повторных запусках он читается из
+        # откомпилированного файла, лежащего рядом с исходным)
+        self.geom = geom.load(file)
+        # вершины хранятся в едином массиве, а объекты R3 служат лишь его
+        # представлениями
+        self.store = VertexStore(self.geom.points)
+        self.vertexes = self.store.r3()
+        for indexes in self.geom.facet_indexes():
+            # массив вершин очередной грани
+            vertexes = [self.vertexes[k] for k in indexes]
+            # задание рёбер грани
+            for n in range(len(indexes)):
+                self.edges.append(Edge(vertexes[n - 1], vertexes[n],
+                                       (indexes[n - 1], indexes[n])))
+            # задание самой грани
+            self.facets.append(Facet(vertexes, indexes))
 
     # Метод изображения полиэдра
     def draw(self, tk):
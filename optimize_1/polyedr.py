@@ -1,13 +1,15 @@
-from math import pi
 from time import time
-from functools import reduce
-from operator import add
 from common.r3 import R3
+from common import geom
+from common.gaps import full, subtract, pairs
+from common.vertexes import VertexStore
 from common.tk_drawer import TkDrawer
 
 
 class Segment:
     """ Одномерный отрезок """
+    __slots__ = ("beg", "fin")
+
     # Параметры конструктора: начало и конец отрезка (числа)
 
     def __init__(self, beg, fin):
@@ -35,14 +37,23 @@ class Segment:
 
 class Edge:
     """ Ребро полиэдра """
+    __slots__ = ("beg", "fin", "indexes", "flat_gaps")
+
     # Начало и конец стандартного одномерного отрезка
     SBEG, SFIN = 0.0, 1.0
 
-    # Параметры конструктора: начало и конец ребра (точки в R3)
-    def __init__(self, beg, fin):
+    # Параметры конструктора: начало и конец ребра (точки в R3) и индексы
+    # этих точек в массиве вершин полиэдра
+    def __init__(self, beg, fin, indexes=None):
         self.beg, self.fin = beg, fin
-        # Список «просветов»
-        self.gaps = [Segment(Edge.SBEG, Edge.SFIN)]
+        self.indexes = indexes
+        # «Просветы» в виде плоского массива концов отрезков
+        self.flat_gaps = full(Edge.SBEG, Edge.SFIN)
+
+    # Список «просветов» в виде отрезков
+    @property
+    def gaps(self):
+        return [Segment(b, f) for b, f in pairs(self.flat_gaps)]
 
     # Учёт тени от одной грани
     def shadow(self, facet):
@@ -62,9 +73,7 @@ class Edge:
         if shade.is_degenerate():
             return
         # Преобразование списка «просветов», если тень невырождена
-        gaps = [s.subtraction(shade) for s in self.gaps]
-        self.gaps = [
-            s for s in reduce(add, gaps, []) if not s.is_degenerate()]
+        subtract(self.flat_gaps, shade.beg, shade.fin)
 
     # Преобразование одномерных координат в трёхмерные
     def r3(self, t):
@@ -84,10 +93,14 @@ class Edge:
 
 class Facet:
     """ Грань полиэдра """
-    # Параметры конструктора: список вершин
+    __slots__ = ("vertexes", "indexes")
+
+    # Параметры конструктора: список вершин и их индексы в массиве
+    # вершин полиэдра
 
-    def __init__(self, vertexes):
+    def __init__(self, vertexes, indexes=None):
         self.vertexes = vertexes
+        self.indexes = indexes
 
     # «Вертикальна» ли грань?
     def is_vertical(self):
@@ -129,36 +142,22 @@ class Polyedr:
         # списки вершин, рёбер и граней полиэдра
         self.vertexes, self.edges, self.facets = [], [], []
 
-        # список строк файла
-        with open(file) as f:
-            for i, line in enumerate(f):
-                if i == 0:
-                    # обрабатываем первую строку; buf - вспомогательный массив
-                    buf = line.split()
-                    # коэффициент гомотетии
-                    c = float(buf.pop(0))
-                    # углы Эйлера, определяющие вращение
-                    alpha, beta, gamma = (float(x) * pi / 180.0 for x in buf)
-                elif i == 1:
-                    # во второй строке число вершин, граней и рёбер полиэдра
-                    nv, nf, ne = (int(x) for x in line.split())
-                elif i < nv + 2:
-                    # задание всех вершин полиэдра
-                    x, y, z = (float(x) for x in line.split())
-                    self.vertexes.append(R3(x, y, z).rz(
-                        alpha).ry(beta).rz(gamma) * c)
-                else:
-                    # вспомогательный массив
-                    buf = line.split()
-                    # количество вершин очередной грани
-                    size = int(buf.pop(0))
-                    # массив вершин этой грани
-                    vertexes = list(self.vertexes[int(n) - 1] for n in buf)
-                    # задание рёбер грани
-                    for n in range(size):
-                        self.edges.append(Edge(vertexes[n - 1], vertexes[n]))
-                    # задание самой грани
-                    self.facets.append(Facet(vertexes))
+        # полиэдр в виде массивов (при повторных запусках он читается из
+        # откомпилированного файла, лежащего рядом с исходным)
+        self.geom = geom.load(file)
+        # вершины хранятся в едином массиве, а объекты R3 служат лишь его
+        # представлениями
+        self.store = VertexStore(self.geom.points)
+        self.vertexes = self.store.r3()
+        for indexes in self.geom.facet_indexes():
+            # массив вершин очередной грани
+            vertexes = [self.vertexes[k] for k in indexes]
+            # задание рёбер грани
+            for n in range(len(indexes)):
+                self.edges.append(Edge(vertexes[n - 1], vertexes[n],
+                                       (indexes[n - 1], indexes[n])))
+            # задание самой грани
+            self.facets.append(Facet(vertexes, indexes))
 
     # Удаление дубликатов рёбер
     def edges_uniq(self):
@@ -195,5 +194,5 @@ class Polyedr:
     def draw(self, tk):
         tk.clean()
         for e in self.edges:
-            for s in e.gaps:
-                tk.draw_line(e.r3(s.beg), e.r3(s.fin))
+            for beg, fin in pairs(e.flat_gaps):
+                tk.draw_line(e.r3(beg), e.r3(fin))
@@ -1,14 +1,31 @@
-from math import pi, sqrt, floor, ceil
+from math import sqrt, floor, ceil, pi
+from array import array
+from itertools import chain
+from multiprocessing import get_context, get_all_start_methods
 from time import time
-from random import randrange
-from functools import reduce
-from operator import add
+import numpy as np
 from common.r3 import R3
+from common import geom
+from common import cache as geomc
+from common.gaps import full, subtract, pairs
+from common.merge import merge_segments, polylines
+from common.shade import FacetBlock, edge_shades, pair_shades, shades_gaps
+from common import nests
+from common.quadtree import QuadTree
+from common.bvh import BVH
+from common.vertexes import VertexStore
 from common.tk_drawer import TkDrawer
 
 
+# Размеры кубов сетки упрощённых полиэдров для постепенно уточняемого
+# изображения (доли большей стороны прямоугольника проекции полиэдра)
+LOD_LEVELS = (0.05,)
+
+
 class Segment:
     """ Одномерный отрезок """
+    __slots__ = ("beg", "fin")
+
     # Параметры конструктора: начало и конец отрезка (числа)
 
     def __init__(self, beg, fin):
@@ -36,19 +53,31 @@ class Segment:
 
 class Edge:
     """ Ребро полиэдра """
+    __slots__ = ("beg", "fin", "indexes", "facets", "flat_gaps", "hint")
+
     # Начало и конец стандартного одномерного отрезка
     SBEG, SFIN = 0.0, 1.0
 
-    # Параметры конструктора: начало и конец ребра (точки в R3)
-    def __init__(self, beg, fin):
+    # Параметры конструктора: начало и конец ребра (точки в R3), индексы
+    # этих точек в массиве вершин полиэдра и номера смежных граней
+    def __init__(self, beg, fin, indexes=None, facets=None):
         self.beg, self.fin = beg, fin
-        # Список «просветов»
-        self.gaps = [Segment(Edge.SBEG, Edge.SFIN)]
+        self.indexes, self.facets = indexes, facets
+        # «Просветы» в виде плоского массива концов отрезков
+        self.flat_gaps = full(Edge.SBEG, Edge.SFIN)
+        # Номер грани, полностью затенившей ребро при последнем удалении
+        # невидимых линий (или None)
+        self.hint = None
+
+    # Список «просветов» в виде отрезков
+    @property
+    def gaps(self):
+        return [Segment(b, f) for b, f in pairs(self.flat_gaps)]
 
     # Учёт тени от одной грани
     def shadow(self, facet):
         # Не надо ничего делать, если «просветов» на ребере не осталось
-        if len(self.gaps) == 0:
+        if len(self.flat_gaps) == 0:
             return
 
         # «Низкие» и «вертикальные» грани не могут затенить ребро
@@ -69,9 +98,7 @@ class Edge:
         if shade.is_degenerate():
             return
         # Преобразование списка «просветов», если тень невырождена
-        gaps = [s.subtraction(shade) for s in self.gaps]
-        self.gaps = [
-            s for s in reduce(add, gaps, []) if not s.is_degenerate()]
+        subtract(self.flat_gaps, shade.beg, shade.fin)
 
     # Преобразование одномерных координат в трёхмерные
     def r3(self, t):
@@ -91,10 +118,19 @@ class Edge:
 
 class Facet:
     """ Грань полиэдра """
-    # Параметры конструктора: список вершин
+    __slots__ = ("vertexes", "indexes", "number", "stamp", "_center",
+                 "_h_normal", "_v_normals", "_is_vertical", "zmax", "xmin",
+                 "ymin", "xmax", "ymax", "area")
+
+    # Параметры конструктора: список вершин, их индексы в массиве
+    # вершин полиэдра и номер грани
 
-    def __init__(self, vertexes):
+    def __init__(self, vertexes, indexes=None, number=None):
         self.vertexes = vertexes
+        self.indexes = indexes
+        self.number = number
+        # номер последнего запроса граней-кандидатов, вернувшего эту грань
+        self.stamp = 0
 
     # «Вертикальна» ли грань?
     def is_vertical(self):
@@ -114,21 +150,42 @@ class Facet:
     def center(self):
         return self._center
 
-    # Предкомпиляция грани
-    def precompile(self):
-        self._center = sum(self.vertexes, R3(0.0, 0.0, 0.0)
-                           ) * (1.0 / len(self.vertexes))
-        n = (
-            self.vertexes[1] - self.vertexes[0]).cross(
-            self.vertexes[2] - self.vertexes[0])
-        self._h_normal = n * (-1.0) if n.dot(Polyedr.V) < 0.0 else n
-        self._v_normals = [self._vert(x) for x in range(len(self.vertexes))]
+    # Предкомпиляция грани; нормаль normal, прямоугольник
+    # box = (xmin, ymin, xmax, ymax, zmax), площадь проекции на плоскость
+    # Oxy area, центр center и нормали к «вертикальным» полупространствам
+    # v_normals могут быть вычислены заранее
+    def precompile(self, box=None, normal=None, area=None, center=None,
+                   v_normals=None):
+        if center is None:
+            self._center = sum(self.vertexes, R3(0.0, 0.0, 0.0)
+                               ) * (1.0 / len(self.vertexes))
+        else:
+            self._center = R3(*center)
+        if normal is None:
+            n = (
+                self.vertexes[1] - self.vertexes[0]).cross(
+                self.vertexes[2] - self.vertexes[0])
+            self._h_normal = n * (-1.0) if n.dot(Polyedr.V) < 0.0 else n
+        else:
+            self._h_normal = R3(*normal)
+        if v_normals is None:
+            self._v_normals = [self._vert(x)
+                               for x in range(len(self.vertexes))]
+        else:
+            self._v_normals = [R3(*n) for n in v_normals]
         self._is_vertical = self.h_normal().dot(Polyedr.V) == 0.0
-        self.zmax = max(v.z for v in self.vertexes)
-        self.xmin = min(v.x for v in self.vertexes)
-        self.ymin = min(v.y for v in self.vertexes)
-        self.xmax = max(v.x for v in self.vertexes)
-        self.ymax = max(v.y for v in self.vertexes)
+        if box is None:
+            self.zmax = max(v.z for v in self.vertexes)
+            self.xmin = min(v.x for v in self.vertexes)
+            self.ymin = min(v.y for v in self.vertexes)
+            self.xmax = max(v.x for v in self.vertexes)
+            self.ymax = max(v.y for v in self.vertexes)
+        else:
+            self.xmin, self.ymin, self.xmax, self.ymax, self.zmax = box
+        if area is None:
+            area = abs(sum(u.x * v.y - v.x * u.y for u, v in zip(
+                self.vertexes[-1:] + self.vertexes[:-1], self.vertexes))) / 2
+        self.area = area
 
     # Вспомогательный метод
     def _vert(self, k):
@@ -142,117 +199,561 @@ class Polyedr:
     # вектор проектирования
     V = R3(0.0, 0.0, 1.0)
 
-    # Параметры конструктора: файл, задающий полиэдр
-    def __init__(self, file):
+    # Параметры конструктора: файл, задающий полиэдр, и, для потоковой
+    # загрузки, число граней в одной порции; вместо файла полиэдр может
+    # быть задан готовыми массивами arrays (объектом geom.Geom, см. lod)
+    def __init__(self, file, chunk=None, arrays=None):
 
-        # списки вершин, рёбер и граней полиэдра
+        # файл полиэдра и списки его вершин, рёбер и граней
+        self.file = file
         self.vertexes, self.edges, self.facets = [], [], []
+        # счётчики последнего удаления невидимых линий: число проверок
+        # затенения ребра гранью, число полностью невидимых рёбер и число
+        # проверок, потребовавшихся для них
+        self.tested = self.hidden = self.hidden_tested = 0
+        # число рёбер, отброшенных как «задние» до удаления невидимых линий
+        self.culled = 0
+        # счётчики последнего изображения: число видимых отрезков,
+        # поглощённых другими при объединении, число отброшенных отрезков
+        # короче пикселя и число нарисованных ломаных
+        self.merged = self.dropped = self.drawn = 0
+        # порядок перебора граней-кандидатов (ключ сортировки или None)
+        self.order = None
+        # номер последнего запроса граней-кандидатов
+        self.stamp = 0
+        # параметры последней оптимизации (для смены точки зрения)
+        self.options = None
+        # полупространства граней в виде массивов (см. facet_block)
+        self.block = None
+
+        if chunk is not None:
+            # при потоковой загрузке сразу читаются лишь вершины, а грани
+            # и рёбра появляются по мере чтения файла методом stream
+            self.source = geom.stream(file, chunk)
+            self.store = VertexStore(self.source.points)
+            self.vertexes = self.store.r3()
+            return
 
-        # список строк файла
-        with open(file) as f:
-            for i, line in enumerate(f):
-                if i == 0:
-                    # обрабатываем первую строку; buf - вспомогательный массив
-                    buf = line.split()
-                    # коэффициент гомотетии
-                    c = float(buf.pop(0))
-                    # углы Эйлера, определяющие вращение
-                    alpha, beta, gamma = (float(x) * pi / 180.0 for x in buf)
-                elif i == 1:
-                    # во второй строке число вершин, граней и рёбер полиэдра
-                    nv, nf, ne = (int(x) for x in line.split())
-                elif i < nv + 2:
-                    # задание всех вершин полиэдра
-                    x, y, z = (float(x) for x in line.split())
-                    self.vertexes.append(R3(x, y, z).rz(
-                        alpha).ry(beta).rz(gamma) * c)
-                else:
-                    # вспомогательный массив
-                    buf = line.split()
-                    # количество вершин очередной грани
-                    size = int(buf.pop(0))
-                    # массив вершин этой грани
-                    vertexes = list(self.vertexes[int(n) - 1] for n in buf)
-                    # задание рёбер грани
-                    for n in range(size):
-                        self.edges.append(Edge(vertexes[n - 1], vertexes[n]))
-                    # задание самой грани
-                    self.facets.append(Facet(vertexes))
-
-    # Удаление дубликатов рёбер
+        # полиэдр в виде массивов (при повторных запусках он читается из
+        # откомпилированного файла, лежащего рядом с исходным)
+        self.geom = geom.load(file) if arrays is None else arrays
+        # вершины хранятся в едином массиве, а объекты R3 служат лишь его
+        # представлениями
+        self.store = VertexStore(self.geom.points)
+        self.vertexes = self.store.r3()
+        for indexes in self.geom.facet_indexes():
+            # массив вершин очередной грани
+            vertexes = [self.vertexes[k] for k in indexes]
+            # задание рёбер грани
+            for n in range(len(indexes)):
+                self.edges.append(Edge(vertexes[n - 1], vertexes[n],
+                                       (indexes[n - 1], indexes[n])))
+            # задание самой грани
+            self.facets.append(Facet(vertexes, indexes, len(self.facets)))
+
+    # Удаление дубликатов рёбер: различные рёбра и смежные с ними грани
+    # находятся ещё при разборе файла по парам индексов вершин
     def edges_uniq(self):
-        edges = {}
-        for e in self.edges:
-            if (e.beg, e.fin) not in edges and (e.fin, e.beg) not in edges:
-                edges[(e.beg, e.fin)] = e
-        self.edges = list(edges.values())
-
-    # Оптимизация
-    def optimize(self):
+        pairs, facets = self.geom.edges()
+        self.edges = [
+            Edge(self.vertexes[i], self.vertexes[j], (i, j), tuple(f))
+            for (i, j), f in zip(pairs.tolist(), facets.tolist())]
+
+    # Отсечение «задних» рёбер: у рёбер, обе смежные грани которых
+    # повёрнуты от наблюдателя, «просветов» не остаётся сразу, и дальше
+    # они не обрабатываются
+    def cull_edges(self):
+        back = self.geom.back_edges().tolist()
+        self.culled = 0
+        for e, b in zip(self.edges, back):
+            if b:
+                e.flat_gaps = array("d")
+                self.culled += 1
+
+    # Оптимизация; index — способ поиска граней-кандидатов: "grid"
+    # (гнёзда сетки, покрывающие прямоугольник ребра), "walk" (гнёзда
+    # сетки, через которые проходит ребро), "quadtree" (дерево квадрантов)
+    # или "bvh" (иерархия охватывающих прямоугольников); step — размер
+    # гнёзд сетки (по умолчанию подобранный ранее функцией tune_step или
+    # вычисленный методом nests_step); cull — отбрасывать ли «задние»
+    # рёбра, заведомо невидимые у замкнутого полиэдра
+    def optimize(self, index="grid", step=None, cull=True):
         stage_time = time()
         result = "   Удаление дубликатов рёбер\n" + \
             "     Рёбер до    : %6d\n" % len(self.edges)
         self.edges_uniq()
         result += "     Рёбер после : %6d\n" % len(self.edges) + \
             "     Время       : %6.2f сек.\n" % (time() - stage_time)
+        self.options = index, step, cull
+        return result + self.prepare(index, step, cull)
+
+    # Смена точки зрения без повторной загрузки полиэдра (после optimize):
+    # c — коэффициент гомотетии, alpha, beta и gamma — углы Эйлера в
+    # градусах, как в первой строке файла полиэдра. Вершины, рёбра и грани
+    # остаются прежними объектами; заново вычисляются лишь зависящие от
+    # точки зрения координаты вершин, предкомпилированные грани, индекс
+    # граней-кандидатов и «просветы» (последние — методом shadow).
+    def view(self, c, alpha, beta, gamma):
         stage_time = time()
-        for f in self.facets:
-            f.precompile()
+        self.geom = self.geom.view(
+            c, *(x * pi / 180.0 for x in (alpha, beta, gamma)))
+        self.store.update(self.geom.points)
+        for e in self.edges:
+            e.flat_gaps = full(Edge.SBEG, Edge.SFIN)
+        result = "   Поворот и гомотетия\n" + \
+            "     Время       : %6.2f сек.\n" % (time() - stage_time)
+        index, step, cull = self.options
+        # размер гнёзд, подобранный для файла, к другой точке зрения не
+        # относится
+        if step is None:
+            step = self.nests_step(self.edges)
+        return result + self.prepare(index, step, cull)
+
+    # Изображения полиэдра с последовательности точек зрения views
+    # (четвёрок (c, alpha, beta, gamma), см. view) после optimize:
+    # генератор выдаёт видимые отрезки каждого кадра (см. segments).
+    # Соседние кадры похожи, поэтому каждое ребро сначала проверяется на
+    # затенение гранью, полностью затенившей его в предыдущем кадре.
+    def turntable(self, views, engine="smart", order=None):
+        for c, alpha, beta, gamma in views:
+            self.view(c, alpha, beta, gamma)
+            self.shadow(engine, order=order)
+            yield self.segments()
+
+    # Видимые отрезки всех рёбер: массив S×2×3 концов «просветов»
+    def segments(self):
+        edges = self.edges
+        ends = self.store.points[np.array(
+            [e.indexes for e in edges], dtype=np.intp).reshape(-1, 2)]
+        sizes = np.fromiter((len(e.flat_gaps) for e in edges),
+                            dtype=np.intp, count=len(edges))
+        t = np.fromiter(chain.from_iterable(e.flat_gaps for e in edges),
+                        dtype=np.float64, count=int(sizes.sum()))[:, None]
+        owner = np.repeat(np.arange(len(edges)), sizes)
+        points = ends[owner, 0] * (Edge.SFIN - t) + ends[owner, 1] * t
+        return points.reshape(-1, 2, 3)
+
+    # Зависящая от точки зрения часть оптимизации: отсечение «задних»
+    # рёбер, предкомпиляция граней и построение индекса граней-кандидатов
+    def prepare(self, index="grid", step=None, cull=True):
+        result = ""
+        self.culled = 0
+        if cull:
+            stage_time = time()
+            self.cull_edges()
+            result = "   Отсечение задних рёбер\n" + \
+                "     Отсечено    : %6d\n" % self.culled + \
+                "     Время       : %6.2f сек.\n" % (time() - stage_time)
+        stage_time = time()
+        g = self.geom
+        boxes, normals = g.boxes().tolist(), g.normals().tolist()
+        areas, centers = g.areas().tolist(), g.centers().tolist()
+        sides, offsets = g.v_normals().tolist(), g.offsets.tolist()
+        for k, f in enumerate(self.facets):
+            f.precompile(boxes[k], normals[k], areas[k], centers[k],
+                         sides[offsets[k]:offsets[k + 1]])
+        self.block = None
         result += "   Предкомпиляция граней\n" + \
             "     Время       : %6.2f сек.\n" % (time() - stage_time)
         stage_time = time()
-        self.facets_nests()
-        result += "   Гнездование граней\n" + \
-            "     Размер гнёзд: %6.2f\n" % self.step + \
-            "     Время       : %6.2f сек." % (time() - stage_time)
+        self.facets_nests(index, step)
+        if index in ("grid", "walk"):
+            result += "   Гнездование граней\n" + \
+                "     Размер гнёзд: %6.2f\n" % self.step
+        elif index == "quadtree":
+            result += "   Дерево квадрантов\n" + \
+                "     Узлов       : %6d\n" % len(self.tree)
+        else:
+            result += "   Иерархия прямоугольников\n" + \
+                "     Узлов       : %6d\n" % len(self.tree)
+        result += "     Время       : %6.2f сек." % (time() - stage_time)
         return result
 
-    # «Умное» нахождение «просветов» на ребре
+    # «Умное» нахождение «просветов» на ребре. Смежные с ребром грани
+    # пропускаются без вычислений: ребро лежит на их границе, и
+    # невырожденной тени они не дают. Первой проверяется грань, полностью
+    # затенившая ребро в прошлый раз (при другой точке зрения), если она
+    # по-прежнему среди кандидатов: при небольшом повороте она, скорее
+    # всего, затеняет ребро и теперь.
     def smart_shadow(self, e):
-        # Хэш учтённых граней
-        processed = {}
+        candidates = self.candidates(e)
+        if self.order is not None:
+            candidates = sorted(candidates, key=self.order)
+        if e.hint is not None:
+            candidates = list(candidates)
+            hint = self.facets[e.hint]
+            if hint in candidates:
+                candidates.remove(hint)
+                candidates.insert(0, hint)
+        own = e.facets or ()
+        tested, e.hint = 0, None
+        for f in candidates:
+            if f.number in own:
+                continue
+            tested += 1
+            e.shadow(f)
+            if len(e.flat_gaps) == 0:
+                e.hint = f.number
+                break
+        self.tested += tested
+        if len(e.flat_gaps) == 0:
+            self.hidden += 1
+            self.hidden_tested += tested
+
+    # Грани-кандидаты из гнёзд, покрывающих прямоугольник ребра, без
+    # повторений: уже выданная грань помечается номером запроса
+    def nests_candidates(self, e):
+        self.stamp += 1
+        stamp = self.stamp
         for i in self.to_range(e.beg.x, e.fin.x):
             for j in self.to_range(e.beg.y, e.fin.y):
                 for f in self.nests[(i, j)]:
-                    if f not in processed:
-                        processed[f] = True
-                        if len(e.gaps) > 0:
-                            e.shadow(f)
-                        else:
-                            return
-
-    # Нахождение «просветов»
-    def shadow(self):
-        for e in self.edges:
-            self.smart_shadow(e)
+                    if f.stamp != stamp:
+                        f.stamp = stamp
+                        yield f
+
+    # Грани-кандидаты из гнёзд, через которые проходит проекция ребра
+    def walk_candidates(self, e):
+        self.stamp += 1
+        stamp = self.stamp
+        for key in nests.walk(e.beg.x, e.beg.y, e.fin.x, e.fin.y,
+                              self.step):
+            for f in self.nests.get(key, ()):
+                if f.stamp != stamp:
+                    f.stamp = stamp
+                    yield f
+
+    # Грани-кандидаты из дерева квадрантов: грани, прямоугольники которых
+    # пересекаются с прямоугольником ребра
+    def tree_candidates(self, e):
+        b, f = e.beg, e.fin
+        return [self.facets[k] for k in self.tree.query(
+            min(b.x, f.x), min(b.y, f.y), max(b.x, f.x), max(b.y, f.y))]
+
+    # Грани-кандидаты из иерархии прямоугольников: грани, прямоугольники
+    # которых пересекаются с проекцией ребра и которые не ниже ребра
+    def bvh_candidates(self, e):
+        b, f = e.beg, e.fin
+        return [self.facets[k]
+                for k in self.tree.query((b.x, b.y, b.z), (f.x, f.y, f.z))]
+
+    # Полупространства граней в виде массивов для способов "vector" и
+    # "bulk" (строятся при первом обращении после предкомпиляции граней)
+    def facet_block(self):
+        if self.block is None:
+            self.block = FacetBlock(self.facets)
+        return self.block
+
+    # Нахождение «просветов» на ребре с помощью векторного вычисления
+    # теней сразу от всех граней-кандидатов
+    def vector_shadow(self, e):
+        ids = {f.number for f in self.candidates(e)}
+        ids.difference_update(e.facets or ())
+        lo, hi = edge_shades(self.facet_block(), (e.beg.x, e.beg.y, e.beg.z),
+                             (e.fin.x, e.fin.y, e.fin.z),
+                             np.fromiter(ids, dtype=np.intp, count=len(ids)))
+        for beg, fin in zip(lo.tolist(), hi.tolist()):
+            subtract(e.flat_gaps, beg, fin)
+            if len(e.flat_gaps) == 0:
+                return
+
+    # Нахождение «просветов» сразу у всех рёбер списка edges (по умолчанию
+    # у всех рёбер полиэдра): пары (ребро, грань) с общим гнездом строятся
+    # по массивам, тени для всех пар находятся одним векторным вычислением,
+    # а затем объединяются для каждого ребра
+    def bulk_shadow(self, edges=None):
+        edges = self.edges if edges is None else edges
+        ends = self.store.points[np.array(
+            [e.indexes for e in edges], dtype=np.intp).reshape(-1, 2)]
+        boxes = np.column_stack((ends.min(axis=1)[:, :2],
+                                 ends.max(axis=1)[:, :2]))
+        facet_boxes = [(f.xmin, f.ymin, f.xmax, f.ymax) for f in self.facets]
+        pairs = nests.pairs(boxes, facet_boxes, self.step)
+        shaded, starts, flat = shades_gaps(*pair_shades(
+            self.facet_block(), ends[:, 0], ends[:, 1], *pairs))
+        flat = flat.tolist()
+        for k, s, t in zip(shaded.tolist(), starts[:-1].tolist(),
+                           starts[1:].tolist()):
+            edges[k].flat_gaps = array("d", flat[s:t])
+
+    # Нахождение «просветов»; engine — способ учёта теней: "smart" (для
+    # каждого ребра грань за гранью), "vector" (для каждого ребра все
+    # грани-кандидаты сразу) или "bulk" (все рёбра и грани сразу);
+    # processes — число процессов, между которыми делятся рёбра; order —
+    # порядок перебора граней-кандидатов способом "smart": None (в порядке
+    # поиска), "depth" (сначала ближайшие к наблюдателю, т. е. с
+    # наибольшим zmax) или "area" (сначала с наибольшей площадью проекции)
+    def shadow(self, engine="smart", processes=1, order=None):
+        self.shadow_method(engine)
+        if order not in ORDERS:
+            raise ValueError(f"неизвестный порядок перебора граней: {order}")
+        self.order = ORDERS[order]
+        self.tested = self.hidden = self.hidden_tested = 0
+        if processes > 1 and "fork" in get_all_start_methods():
+            # массивы граней строятся до порождения процессов, чтобы не
+            # повторять этого в каждом из них
+            if engine != "smart":
+                self.facet_block()
+            self.parallel_shadow(engine, processes)
+        else:
+            self.shade_edges(self.edges, engine)
         return self
 
-    # Метод изображения полиэдра
-    def draw(self, tk):
+    # Метод учёта теней на одном ребре для способа engine (для способа
+    # "bulk", обрабатывающего рёбра только вместе, — None)
+    def shadow_method(self, engine):
+        if engine == "smart":
+            return self.smart_shadow
+        if engine == "vector":
+            return self.vector_shadow
+        if engine == "bulk":
+            return None
+        raise ValueError(f"неизвестный способ удаления линий: {engine}")
+
+    # Нахождение «просветов» у рёбер списка edges способом engine (рёбра
+    # без «просветов», например отсечённые, пропускаются)
+    def shade_edges(self, edges, engine="smart"):
+        edge_shadow = self.shadow_method(engine)
+        edges = [e for e in edges if len(e.flat_gaps) > 0]
+        if edge_shadow is None:
+            self.bulk_shadow(edges)
+        else:
+            for e in edges:
+                edge_shadow(e)
+
+    # Параллельное нахождение «просветов» в processes процессах. Процессы
+    # порождаются вызовом fork и наследуют полиэдр вместе с гранями и
+    # гнёздами, поэтому им передаются лишь границы порций рёбер, а обратно
+    # возвращаются плоские массивы «просветов» этих порций.
+    def parallel_shadow(self, engine, processes):
+        global _forked
+        size = -(-len(self.edges) // (4 * processes)) or 1
+        bounds = [(k, min(k + size, len(self.edges)))
+                  for k in range(0, len(self.edges), size)]
+        _forked = self, engine
+        try:
+            with get_context("fork").Pool(processes) as pool:
+                for (beg, fin), (sizes, flat, counts) in zip(
+                        bounds, pool.imap(_shadow_part, bounds)):
+                    self.tested += counts[0]
+                    self.hidden += counts[1]
+                    self.hidden_tested += counts[2]
+                    k = 0
+                    for e, n in zip(self.edges[beg:fin], sizes):
+                        e.flat_gaps = flat[k:k + n]
+                        k += n
+        finally:
+            _forked = None
+
+    # Потоковая загрузка с одновременным удалением невидимых линий,
+    # заменяющая собой optimize и shadow: каждая прочитанная порция граней
+    # сразу учитывается при нахождении «просветов» как у новых, так и у
+    # ранее прочитанных рёбер. Генератор выдаёт число обработанных граней.
+    def stream(self):
+        # гнёзда граней и гнёзда рёбер (рёбра размещаются в гнёздах так же,
+        # как и грани, — по прямоугольникам)
+        self.nests, edge_nests = {}, {}
+        self.candidates = self.nests_candidates
+        for part in self.source:
+            facets = [Facet([self.vertexes[k] for k in indexes], indexes,
+                            part.first + n)
+                      for n, indexes in enumerate(part.facet_indexes())]
+            boxes = part.boxes().tolist()
+            normals = part.normals().tolist()
+            areas = part.areas().tolist()
+            for f, box, normal, area in zip(facets, boxes, normals, areas):
+                f.precompile(box, normal, area)
+            # рёбра приходят уже без дубликатов
+            edges = [Edge(self.vertexes[i], self.vertexes[j], (i, j))
+                     for i, j in part.edges.tolist()]
+            if not self.facets:
+                self.step = self.nests_step(edges)
+            # ранее прочитанные рёбра затеняются лишь новыми гранями
+            for f in facets:
+                self.smart_facet_shadow(f, edge_nests)
+            self.nest(facets, self.nests)
+            self.facets.extend(facets)
+            # новые рёбра затеняются всеми прочитанными гранями
+            for e in edges:
+                self.smart_shadow(e)
+                for i in self.to_range(e.beg.x, e.fin.x):
+                    for j in self.to_range(e.beg.y, e.fin.y):
+                        edge_nests.setdefault((i, j), []).append(e)
+            self.edges.extend(edges)
+            yield len(self.facets)
+
+    # Учёт тени от грани на рёбрах из гнёзд edge_nests, которые она
+    # пересекает (двойственно к smart_shadow)
+    def smart_facet_shadow(self, f, edge_nests):
+        # Хэш учтённых рёбер
+        processed = {}
+        for i in self.to_range(f.xmin, f.xmax):
+            for j in self.to_range(f.ymin, f.ymax):
+                for e in edge_nests.get((i, j), ()):
+                    if e not in processed:
+                        processed[e] = True
+                        e.shadow(f)
+
+    # Упрощённый полиэдр для быстрого предварительного изображения (после
+    # optimize): вершины, попавшие в один куб сетки, объединяются (см.
+    # geom.Geom.cluster); ребро куба — доля level большей стороны
+    # прямоугольника проекции полиэдра. Упрощённый полиэдр не связан с
+    # файлом, оптимизирован теми же способами, что и исходный, и может
+    # удалять невидимые линии и рисоваться как обычно.
+    def lod(self, level):
+        xy = self.geom.points[:, :2]
+        size = float((xy.max(axis=0) - xy.min(axis=0)).max()) if len(xy) \
+            else 0.0
+        coarse = Polyedr(None, arrays=self.geom.cluster(
+            level * size if size > 0.0 else 1.0))
+        index, step, cull = self.options
+        coarse.optimize(index, None, cull)
+        return coarse
+
+    # Постепенно уточняемое изображение (после optimize): сначала
+    # рисуются упрощённые полиэдры с размерами кубов сетки levels (см.
+    # lod, по убыванию), затем сам полиэдр; каждое изображение заменяет
+    # предыдущее. Генератор выдаёт нарисованные полиэдры, так что
+    # уточнение можно прервать.
+    def progressive(self, tk, levels=LOD_LEVELS, engine="smart"):
+        for level in levels:
+            coarse = self.lod(level)
+            coarse.shadow(engine)
+            coarse.draw(tk)
+            tk.flush()
+            yield coarse
+        self.shadow(engine)
+        self.draw(tk)
+        tk.flush()
+        yield self
+
+    # Метод изображения полиэдра: видимые отрезки, лежащие на одной прямой
+    # и касающиеся друг друга, объединяются, а затем сцепляются в ломаные
+    # (см. common.merge); merge=False рисует отрезки как есть
+    def draw(self, tk, merge=True):
         tk.clean()
-        for e in self.edges:
-            for s in e.gaps:
-                tk.draw_line(e.r3(s.beg), e.r3(s.fin))
-
-    # Размещение граней по гнёздам
-    def facets_nests(self):
-        COUNT = 100
-        self.nests = {}
-        # Вычисление оптимального размера гнёзд сетки
-        edges = [self.edges[randrange(len(self.edges))] for i in range(COUNT)]
-        self.step = sum((sqrt((e.fin.x - e.beg.x)**2 + (e.fin.y - e.beg.y)**2)
-                         for e in edges)) / (2 * COUNT)
-        for f in self.facets:
+        if not merge:
+            tk.draw_lines(self.segments())
+            return
+        segments, self.merged, self.dropped = merge_segments(self.segments())
+        lines = polylines(segments)
+        self.drawn = len(lines)
+        tk.draw_polylines(lines)
+
+    # Размещение граней по гнёздам сетки (index = "grid"), в дереве
+    # квадрантов (index = "quadtree") или в иерархии прямоугольников
+    # (index = "bvh"). Размер гнёзд step нужен в любом случае: по нему
+    # способ "bulk" строит пары (ребро, грань).
+    def facets_nests(self, index="grid", step=None):
+        if step is None:
+            step = self.saved_step()
+        if step is None:
+            step = self.nests_step(self.edges)
+        self.step = step
+        self.nests = self.tree = None
+        if index == "grid":
+            self.nests = self.nest(self.facets, {})
+            self.candidates = self.nests_candidates
+        elif index == "walk":
+            self.nests = self.nest(self.facets, {})
+            self.candidates = self.walk_candidates
+        elif index == "quadtree":
+            self.tree = QuadTree(
+                [(f.xmin, f.ymin, f.xmax, f.ymax) for f in self.facets])
+            self.candidates = self.tree_candidates
+        elif index == "bvh":
+            self.tree = BVH([(f.xmin, f.ymin, f.xmax, f.ymax, f.zmax)
+                             for f in self.facets])
+            self.candidates = self.bvh_candidates
+        else:
+            raise ValueError(f"неизвестный способ поиска граней: {index}")
+
+    # Вычисление размера гнёзд сетки: половина средней длины проекций
+    # всех рёбер (размер не зависит от случая, поэтому время работы
+    # воспроизводимо)
+    def nests_step(self, edges):
+        step = sum((sqrt((e.fin.x - e.beg.x)**2 + (e.fin.y - e.beg.y)**2)
+                    for e in edges)) / (2 * max(len(edges), 1))
+        return step if step > 0.0 else 1.0
+
+    # Размер гнёзд, подобранный ранее для файла полиэдра, или None
+    def saved_step(self):
+        if self.file is None:
+            return None
+        try:
+            return geomc.load_step(self.file, geomc.source_stamp(self.file))
+        except (OSError, ValueError):
+            return None
+
+    # Добавление граней в словарь гнёзд
+    def nest(self, facets, nests):
+        for f in facets:
             for i in self.to_range(f.xmin, f.xmax):
                 for j in self.to_range(f.ymin, f.ymax):
                     key = (i, j)
-                    if key in self.nests:
-                        self.nests[key].append(f)
+                    if key in nests:
+                        nests[key].append(f)
                     else:
-                        self.nests[key] = [f]
+                        nests[key] = [f]
+        return nests
 
     # Диапазон индексов гнёзд для отрезка
     def to_range(self, t1, t2):
         if t1 > t2:
             t1, t2 = t2, t1
         return range(floor(t1 / self.step), ceil(t2 / self.step) + 1)
+
+
+# Ключи сортировки граней-кандидатов для порядков их перебора
+ORDERS = {
+    None: None,
+    "depth": lambda f: -f.zmax,
+    "area": lambda f: -f.area,
+}
+
+# Множители размера гнёзд, перебираемые при его подборе
+TUNE_FACTORS = (0.25, 0.35, 0.5, 0.7, 1.0, 1.4, 2.0, 2.8, 4.0)
+
+
+# Подбор размера гнёзд сетки для файла полиэдра: размер, вычисленный
+# методом nests_step, умножается на каждый из множителей factors, и с
+# полученным размером выполняются оптимизация и удаление невидимых линий
+# (repeat раз, учитывается лучшее время). Самый быстрый размер
+# сохраняется рядом с файлом, и затем метод optimize использует его по
+# умолчанию. Возвращаются этот размер и список пар (размер, время).
+def tune_step(file, factors=TUNE_FACTORS, repeat=1, index="grid",
+              engine="smart"):
+    poly = Polyedr(file)
+    poly.edges_uniq()
+    base = poly.nests_step(poly.edges)
+    timings = []
+    for factor in factors:
+        best = None
+        for k in range(repeat):
+            poly = Polyedr(file)
+            start = time()
+            poly.optimize(index, base * factor)
+            poly.shadow(engine)
+            elapsed = time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append((base * factor, best))
+    step = min(timings, key=lambda t: t[1])[0]
+    geomc.save_step(file, geomc.source_stamp(file), step)
+    return step, timings
+
+
+# Полиэдр и способ учёта теней, наследуемые процессами-потомками
+_forked = None
+
+
+# Нахождение «просветов» у рёбер с номерами из диапазона [beg, fin)
+# унаследованного полиэдра: число концов «просветов» каждого ребра и
+# концы «просветов» всех рёбер подряд, а также счётчики проверок
+def _shadow_part(bounds):
+    polyedr, engine = _forked
+    polyedr.tested = polyedr.hidden = polyedr.hidden_tested = 0
+    edges = polyedr.edges[bounds[0]:bounds[1]]
+    polyedr.shade_edges(edges, engine)
+    return (array("l", [len(e.flat_gaps) for e in edges]),
+            array("d", chain.from_iterable(e.flat_gaps for e in edges)),
+            (polyedr.tested, polyedr.hidden, polyedr.hidden_tested))
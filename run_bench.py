@@ -0,0 +1,48 @@
+#!/usr/bin/env -S python3 -B
+
+# Сравнение вариантов программы без окна Tk и без ожидания ввода: время
+# этапов (загрузка, оптимизация, удаление невидимых линий, изображение)
+# измеряется несколько раз, медианы и стандартные отклонения печатаются и
+# записываются в JSON, а при заданном базовом файле регрессии отмечаются,
+# и программа завершается с кодом 1.
+
+from argparse import ArgumentParser
+from common import bench
+
+parser = ArgumentParser(description="Сравнение вариантов программы")
+parser.add_argument("--variants", nargs="+", default=bench.VARIANTS,
+                    choices=bench.VARIANTS, metavar="VARIANT")
+parser.add_argument("--models", nargs="+", default=bench.MODELS,
+                    metavar="MODEL")
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--warmup", type=int, default=1)
+parser.add_argument("--limit", type=float, default=60.0,
+                    help="наибольшее время одного прогона (сек.)")
+parser.add_argument("--output", default="bench.json")
+parser.add_argument("--baseline")
+parser.add_argument("--tolerance", type=float, default=bench.TOLERANCE)
+args = parser.parse_args()
+
+
+def report(variant, model, entry):
+    times = " ".join(
+        "%s %8.4f±%.4f" % (stage, entry[stage]["median"],
+                           entry[stage]["stdev"])
+        for stage in bench.STAGES + ("total",) if stage in entry)
+    note = " (прервано по времени)" if entry["timeout"] else ""
+    print("%-11s %-6s %s%s" % (variant, model, times, note), flush=True)
+
+
+results = bench.bench(args.variants, args.models, args.repeat, args.warmup,
+                      args.limit, report=report)
+bench.save(results, args.output)
+print(f"Результаты записаны в {args.output}")
+if args.baseline:
+    found = bench.regressions(results, bench.load(args.baseline),
+                              args.tolerance)
+    for variant, model, stage, old, new in found:
+        print("РЕГРЕССИЯ %-11s %-6s %-8s %8.4f -> %8.4f сек." % (
+            variant, model, stage, old, new))
+    if found:
+        exit(1)
+    print("Регрессий нет")
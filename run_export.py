@@ -0,0 +1,30 @@
+#!/usr/bin/env -S python3 -B
+
+# Запись изображений полиэдров (вариант optimize_7) в файлы без окна Tk:
+# первый аргумент — формат (svg, ppm или png), остальные — имена полиэдров.
+# Изображение полиэдра name записывается в файл name.<формат>.
+
+import sys
+from time import time
+from common.file_drawer import FileDrawer, FORMATS
+from optimize_7.polyedr import Polyedr
+
+if len(sys.argv) < 2 or sys.argv[1] not in FORMATS:
+    print("\nНеобходимо указание формата изображения (%s), например,\n"
+          "    python run_export.py png king cow\n" % ", ".join(FORMATS))
+    exit(1)
+
+for name in sys.argv[2:] or ["king", "cow"]:
+    tk = FileDrawer(f"{name}.{sys.argv[1]}")
+    start = time()
+    poly = Polyedr(f"data/{name}.geom")
+    poly.optimize()
+    poly.shadow()
+    shadow = time() - start
+    start = time()
+    poly.draw(tk)
+    tk.close()
+    print("%-6s: удаление невидимых линий %6.3f сек., запись %s %6.3f сек."
+          % (name, shadow, tk.file, time() - start))
+    print("        отрезков объединено %d, отброшено %d, ломаных %d" % (
+        poly.merged, poly.dropped, poly.drawn))
@@ -0,0 +1,26 @@
+#!/usr/bin/env -S python3 -B
+
+# Постепенно уточняемое изображение полиэдров (вариант optimize_7): сразу
+# рисуется упрощённый полиэдр, а затем его сменяет изображение самого
+# полиэдра.
+
+import sys
+from time import time
+from common.tk_drawer import TkDrawer
+from optimize_7.polyedr import Polyedr
+
+tk = TkDrawer()
+try:
+    for name in sys.argv[1:] or ["king", "cow"]:
+        print("=============================================================")
+        print(f"Начало работы с полиэдром '{name}'")
+        poly = Polyedr(f"data/{name}.geom")
+        poly.optimize()
+        start = time()
+        for shown in poly.progressive(tk):
+            print("  граней %6d, изображение через %6.3f сек." % (
+                len(shown.facets), time() - start))
+        input("Hit 'Return' to continue -> ")
+except (EOFError, KeyboardInterrupt):
+    print("\nStop")
+    tk.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/env -S python3 -B
+
+# Сравнение способов поиска граней-кандидатов при удалении невидимых линий
+# (вариант optimize_7): время построения и запросов, среднее число гнёзд
+# сетки, граней-кандидатов и проверок затенения на одно ребро
+
+from time import time
+import sys
+from optimize_7.polyedr import Polyedr
+from common import nests
+
+INDEXES = ["grid", "walk", "quadtree", "bvh"]
+NAMES = sys.argv[1:] or ["ccc", "cube", "box", "king", "cow", "babem"]
+
+
+# Число гнёзд сетки, просматриваемых при поиске граней-кандидатов ребра
+def cells(poly, index, e):
+    if index == "grid":
+        return len(poly.to_range(e.beg.x, e.fin.x)) * \
+            len(poly.to_range(e.beg.y, e.fin.y))
+    if index == "walk":
+        return sum(1 for c in nests.walk(e.beg.x, e.beg.y, e.fin.x, e.fin.y,
+                                         poly.step))
+    return 0
+
+
+print("%-8s %-9s %9s %9s %9s %9s %9s %9s" % (
+    "Полиэдр", "Поиск", "Постр.,с", "Запр.,с", "Гнёзда", "Кандидаты",
+    "Проверки", "Тени,с"))
+for name in NAMES:
+    for index in INDEXES:
+        poly = Polyedr(f"data/{name}.geom")
+        poly.optimize(index)
+        start = time()
+        poly.facets_nests(index)
+        build = time() - start
+        start = time()
+        found = sum(len(list(poly.candidates(e))) for e in poly.edges)
+        query = time() - start
+        visited = sum(cells(poly, index, e) for e in poly.edges)
+        start = time()
+        poly.shadow()
+        shadow = time() - start
+        n = max(len(poly.edges), 1)
+        print("%-8s %-9s %9.3f %9.3f %9.1f %9.1f %9.1f %9.3f" % (
+            name, index, build, query, visited / n, found / n,
+            poly.tested / n, shadow))
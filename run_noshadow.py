@@ -12,6 +12,7 @@ try:
         print(f"Начало работы с полиэдром '{name}'")
         start_time = time()
         Polyedr(f"data/{name}.geom").draw(tk)
+        tk.flush()
         delta_time = time() - start_time
         print(f"Изображение полиэдра '{name}' заняло {delta_time} сек.")
         input("Hit 'Return' to continue -> ")
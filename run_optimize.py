@@ -1,6 +1,7 @@
 #!/usr/bin/env -S python3 -B
 
 from time import time
+from functools import partialmethod
 from common.tk_drawer import TkDrawer, x, y
 import sys
 try:
@@ -18,6 +19,10 @@ def draw_line(self, p, q):
 
 
 setattr(TkDrawer, 'draw_line', draw_line)
+setattr(TkDrawer, 'draw_lines',
+        partialmethod(TkDrawer.draw_lines, line_width=1))
+setattr(TkDrawer, 'draw_polylines',
+        partialmethod(TkDrawer.draw_polylines, line_width=1))
 
 tk = TkDrawer()
 
@@ -41,7 +46,7 @@ try:
         print("%6.2f сек." % (start_draw_time - start_shadow_time))
         print("Изображение полиэдра ------------------> ", end="", flush=True)
         poly.draw(tk)
-        tk.root.update()
+        tk.flush()
         print("%6.2f сек." % (time() - start_draw_time))
         input("Hit 'Return' to continue -> ")
 except (EOFError, KeyboardInterrupt):
@@ -28,7 +28,7 @@ try:
         print("%6.2f сек." % (start_draw_time - start_shadow_time))
         print("Изображение полиэдра ------------------> ", end="", flush=True)
         poly.draw(tk)
-        tk.root.update()
+        tk.flush()
         print("%6.2f сек." % (time() - start_draw_time))
         input("Hit 'Return' to continue -> ")
 except (EOFError, KeyboardInterrupt):
@@ -11,6 +11,7 @@ try:
         print(f"Начало работы с полиэдром '{name}'")
         start_time = time()
         Polyedr(f"data/{name}.geom").draw(tk)
+        tk.flush()
         delta_time = time() - start_time
         print(f"Сумма площадей граней: \
             {Polyedr(f'data/{name}.geom').calculate_special_area()}")
@@ -0,0 +1,15 @@
+#!/usr/bin/env -S python3 -B
+
+# Подбор размера гнёзд сетки для полиэдров (вариант optimize_7). Подобранный
+# размер сохраняется в файле data/<имя>.geom.step и затем используется
+# методом Polyedr.optimize по умолчанию.
+
+import sys
+from optimize_7.polyedr import tune_step
+
+for name in sys.argv[1:] or ["king", "cow", "babem"]:
+    step, timings = tune_step(f"data/{name}.geom", repeat=3)
+    print(f"Полиэдр '{name}'")
+    for s, t in timings:
+        print("  размер гнёзд %8.3f: %6.3f сек.%s" % (
+            s, t, "  <--" if s == step else ""))
@@ -0,0 +1,32 @@
+#!/usr/bin/env -S python3 -B
+
+# Поворот полиэдров вокруг оси (вариант optimize_7): изображения с
+# последовательности точек зрения строятся без повторной загрузки файла, и
+# результат сравнивается с построением каждого кадра «с нуля».
+
+import sys
+from time import time
+from optimize_7.polyedr import Polyedr
+
+FRAMES = 36
+
+for name in sys.argv[1:] or ["king", "cow"]:
+    file = f"data/{name}.geom"
+    with open(file) as f:
+        c, alpha, beta, gamma = (float(x) for x in f.readline().split())
+    views = [(c, alpha + 360.0 * k / FRAMES, beta, gamma)
+             for k in range(FRAMES)]
+    print(f"Полиэдр '{name}', кадров: {FRAMES}")
+    start = time()
+    poly = Polyedr(file)
+    poly.optimize()
+    poly.view(*views[0])
+    poly.shadow()
+    cold = time() - start
+    print("  кадр «с нуля»   : %6.3f сек." % cold)
+    start = time()
+    segments = sum(len(s) for s in poly.turntable(views))
+    total = time() - start
+    print("  поворот         : %6.3f сек. на кадр, %5.1f кадров/сек." % (
+        total / FRAMES, FRAMES / total))
+    print("  отрезков в кадре: %6d" % (segments // FRAMES))
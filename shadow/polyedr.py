@@ -1,12 +1,15 @@
-from math import pi, atan2
-from functools import reduce
-from operator import add
-from common.r3 import R3
+from math import atan2
+from common.r3 import R3, good_points
+from common import geom
+from common.gaps import full, subtract, pairs
+from common.vertexes import VertexStore
 
 
 class Segment:
     """Одномерный отрезок"""
 
+    __slots__ = ("beg", "fin")
+
     # Параметры конструктора: начало и конец отрезка (числа)
 
     def __init__(self, beg, fin):
@@ -39,16 +42,25 @@ class Segment:
 class Edge:
     """Ребро полиэдра"""
 
+    __slots__ = ("beg", "fin", "indexes", "flat_gaps", "shade")
+
     # Начало и конец стандартного одномерного отрезка
     SBEG, SFIN = 0.0, 1.0
 
-    # Параметры конструктора: начало и конец ребра (точки в R3)
-    def __init__(self, beg, fin):
+    # Параметры конструктора: начало и конец ребра (точки в R3) и индексы
+    # этих точек в массиве вершин полиэдра
+    def __init__(self, beg, fin, indexes=None):
         self.beg, self.fin = beg, fin
-        # Список «просветов»
-        self.gaps = [Segment(Edge.SBEG, Edge.SFIN)]
+        self.indexes = indexes
+        # «Просветы» в виде плоского массива концов отрезков
+        self.flat_gaps = full(Edge.SBEG, Edge.SFIN)
         self.shade = [Segment(Edge.SFIN, Edge.SBEG)]
 
+    # Список «просветов» в виде отрезков
+    @property
+    def gaps(self):
+        return [Segment(b, f) for b, f in pairs(self.flat_gaps)]
+
     # Учёт тени от одной грани
     def shadow(self, facet):
         # «Вертикальная» грань не затеняет ничего
@@ -68,8 +80,7 @@ class Edge:
         if shade.is_degenerate():
             return
         # Преобразование списка «просветов», если тень невырождена
-        gaps = [s.subtraction(shade) for s in self.gaps]
-        self.gaps = [s for s in reduce(add, gaps, []) if not s.is_degenerate()]
+        subtract(self.flat_gaps, shade.beg, shade.fin)
 
     def subtract_gaps_from_full(self):
         full = [Segment(0.0, 1.0)]
@@ -99,14 +110,23 @@ class Edge:
 class Facet:
     """Грань полиэдра"""
 
-    # Параметры конструктора: список вершин
+    __slots__ = ("vertexes", "indexes", "area", "good_vertices_count")
+
+    # Параметры конструктора: список вершин, их индексы в массиве
+    # вершин полиэдра и заранее вычисленные признаки «хороших» вершин
+    # полиэдра (по одному на каждую вершину массива)
 
-    def __init__(self, vertexes):
+    def __init__(self, vertexes, indexes=None, good=None):
         self.vertexes = vertexes
+        self.indexes = indexes
         self.area = self._area(Polyedr.scale)
-        self.good_vertices_count = sum(
-            1 for v in self.vertexes if v.is_good_point(
-                Polyedr.alpha, Polyedr.beta, Polyedr.gamma, Polyedr.scale))
+        if good is not None and indexes is not None:
+            self.good_vertices_count = sum(good[k] for k in indexes)
+        else:
+            self.good_vertices_count = sum(
+                1 for v in self.vertexes if v.is_good_point(
+                    Polyedr.alpha, Polyedr.beta, Polyedr.gamma,
+                    Polyedr.scale))
 
     # Возвращает True, если не более 2 вершин грани - "хорошие"
     def qualifies_for_special_area(self):
@@ -171,42 +191,32 @@ class Polyedr:
         # списки вершин, рёбер и граней полиэдра
         self.vertexes, self.edges, self.facets = [], [], []
 
-        # список строк файла
-        with open(file) as f:
-            for i, line in enumerate(f):
-                if i == 0:
-                    # обрабатываем первую строку; buf - вспомогательный массив
-                    buf = line.split()
-                    # коэффициент гомотетии
-                    c = float(buf.pop(0))
-                    Polyedr.scale = c
-                    # углы Эйлера, определяющие вращение
-                    alpha, beta, gamma = (float(x) * pi / 180.0 for x in buf)
-                    Polyedr.alpha, Polyedr.beta, Polyedr.gamma = (
-                        alpha,
-                        beta,
-                        gamma,
-                    )
-                elif i == 1:
-                    # во второй строке число вершин, граней и рёбер полиэдра
-                    nv, nf, ne = (int(x) for x in line.split())
-                elif i < nv + 2:
-                    # задание всех вершин полиэдра
-                    x, y, z = (float(x) for x in line.split())
-                    self.vertexes.append(
-                        R3(x, y, z).rz(alpha).ry(beta).rz(gamma) * c)
-                else:
-                    # вспомогательный массив
-                    buf = line.split()
-                    # количество вершин очередной грани
-                    size = int(buf.pop(0))
-                    # массив вершин этой грани
-                    vertexes = list(self.vertexes[int(n) - 1] for n in buf)
-                    # задание рёбер грани
-                    for n in range(size):
-                        self.edges.append(Edge(vertexes[n - 1], vertexes[n]))
-                    # задание самой грани
-                    self.facets.append(Facet(vertexes))
+        # полиэдр в виде массивов (при повторных запусках он читается из
+        # откомпилированного файла, лежащего рядом с исходным)
+        self.geom = geom.load(file)
+        # коэффициент гомотетии и углы Эйлера, определяющие вращение
+        Polyedr.scale = self.geom.c
+        Polyedr.alpha, Polyedr.beta, Polyedr.gamma = (
+            self.geom.alpha,
+            self.geom.beta,
+            self.geom.gamma,
+        )
+        # вершины хранятся в едином массиве, а объекты R3 служат лишь его
+        # представлениями
+        self.store = VertexStore(self.geom.points)
+        self.vertexes = self.store.r3()
+        # каждая вершина классифицируется лишь один раз
+        good = good_points(self.store.points, Polyedr.alpha, Polyedr.beta,
+                           Polyedr.gamma, Polyedr.scale).tolist()
+        for indexes in self.geom.facet_indexes():
+            # массив вершин очередной грани
+            vertexes = [self.vertexes[k] for k in indexes]
+            # задание рёбер грани
+            for n in range(len(indexes)):
+                self.edges.append(Edge(vertexes[n - 1], vertexes[n],
+                                       (indexes[n - 1], indexes[n])))
+            # задание самой грани
+            self.facets.append(Facet(vertexes, indexes, good))
 
     def calculate_special_area(self):
         return sum(f.get_special_area() for f in self.facets)
@@ -217,16 +227,20 @@ class Polyedr:
         tk.draw_axes(Polyedr.alpha, Polyedr.beta, Polyedr.gamma, Polyedr.scale)
         tk.draw_plane(Polyedr.alpha, Polyedr.beta, Polyedr.gamma,
                       Polyedr.scale)
+        # концы рёбер, видимые и невидимые части рёбер собираются в
+        # списки и рисуются массивами
+        points, lines, dashes = [], [], []
         for e in self.edges:
-            a1, a2 = e.beg, e.fin
-            tk.draw_point(a1, Polyedr.alpha, Polyedr.beta, Polyedr.gamma,
-                          Polyedr.scale)
-            tk.draw_point(a2, Polyedr.alpha, Polyedr.beta, Polyedr.gamma,
-                          Polyedr.scale)
+            points.append(e.beg)
+            points.append(e.fin)
             for f in self.facets:
                 e.shadow(f)
-            for s in e.gaps:
-                tk.draw_line(e.r3(s.beg), e.r3(s.fin))
+            for beg, fin in pairs(e.flat_gaps):
+                lines.append((e.r3(beg), e.r3(fin)))
             shades = e.subtract_gaps_from_full()
             for s in shades:
-                tk.draw_line(e.r3(s.beg), e.r3(s.fin), dash=(10, 25))
+                dashes.append((e.r3(s.beg), e.r3(s.fin)))
+        tk.draw_points(points, Polyedr.alpha, Polyedr.beta, Polyedr.gamma,
+                       Polyedr.scale)
+        tk.draw_lines(lines)
+        tk.draw_lines(dashes, dash=(10, 25))
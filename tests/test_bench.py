@@ -0,0 +1,70 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from common import bench
+from tests.test_geom import BOX
+
+
+class TestBench(unittest.TestCase):
+
+    # Полиэдр для измерений записывается во временный каталог
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.data = os.path.join(self.dir.name, '{}.geom')
+        with open(self.data.format('box'), 'w') as f:
+            f.write(BOX)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # Этапы, которых у варианта нет, не измеряются
+    def test_measure01(self):
+        self.assertEqual(list(bench.measure('noshadow', 'box', self.data)),
+                         ['load', 'draw'])
+        self.assertEqual(list(bench.measure('optimize_7', 'box', self.data)),
+                         list(bench.STAGES))
+
+    # Прогоны «разогрева» не учитываются, а медиана лежит между
+    # наименьшим и наибольшим временем
+    def test_bench01(self):
+        r = bench.bench(['optimize_1'], ['box'], repeat=3, warmup=1,
+                        data=self.data)
+        entry = r['results']['optimize_1']['box']
+        self.assertEqual((entry['runs'], entry['timeout']), (3, False))
+        for stage in bench.STAGES + ('total',):
+            times = entry[stage]['times']
+            self.assertEqual(len(times), 3)
+            self.assertTrue(min(times) <= entry[stage]['median'] <=
+                            max(times))
+            self.assertGreaterEqual(entry[stage]['stdev'], 0.0)
+
+    # Прогон, не уложившийся в срок, прерывается, и другие не выполняются
+    def test_bench02(self):
+        r = bench.bench(['optimize_7'], ['box'], repeat=2, warmup=0,
+                        limit=0.0, data=self.data)
+        entry = r['results']['optimize_7']['box']
+        self.assertEqual((entry['runs'], entry['timeout']), (0, True))
+
+    # Результаты сохраняются в JSON и читаются обратно
+    def test_save01(self):
+        r = bench.bench(['noshadow'], ['box'], repeat=1, warmup=0,
+                        data=self.data)
+        file = os.path.join(self.dir.name, 'bench.json')
+        bench.save(r, file)
+        self.assertEqual(bench.load(file), r)
+
+    # Регрессии — заметные и превышающие шум замедления этапов, а также
+    # прогоны, впервые не уложившиеся в срок
+    def test_regressions01(self):
+        def result(shadow, total, timeout=False):
+            return {'results': {'optimize_7': {'box': {
+                'shadow': {'median': shadow}, 'total': {'median': total},
+                'timeout': timeout}}}}
+        base = result(1.0, 0.001)
+        self.assertEqual(bench.regressions(result(1.2, 0.004), base), [])
+        self.assertEqual(bench.regressions(result(1.5, 0.004), base),
+                         [('optimize_7', 'box', 'shadow', 1.0, 1.5)])
+        self.assertEqual(
+            bench.regressions(result(1.0, 0.001, True), base),
+            [('optimize_7', 'box', 'total', 0.001, float('inf'))])
@@ -0,0 +1,52 @@
+import unittest
+from random import Random
+
+from common.bvh import BVH, _crosses
+
+
+class TestBVH(unittest.TestCase):
+
+    # Пустая иерархия ничего не находит
+    def test_query01(self):
+        t = BVH([])
+        self.assertEqual(t.query((0.0, 0.0, 0.0), (1.0, 1.0, 0.0)), [])
+
+    # Диагональный отрезок не задевает угол прямоугольника, хотя
+    # прямоугольники пересекаются
+    def test_query02(self):
+        t = BVH([(0.0, 0.0, 1.0, 1.0, 1.0), (1.5, 0.0, 2.0, 0.4, 1.0)])
+        self.assertEqual(t.query((0.0, 0.0, 0.0), (2.0, 2.0, 0.0)), [0])
+
+    # «Низкие» грани пропускаются
+    def test_query03(self):
+        t = BVH([(0.0, 0.0, 1.0, 1.0, 1.0), (0.0, 0.0, 1.0, 1.0, 3.0)])
+        self.assertEqual(t.query((0.0, 0.0, 2.0), (1.0, 1.0, 5.0)), [1])
+
+    # Запросы совпадают с перебором всех граней
+    def test_query04(self):
+        rnd = Random(1)
+        boxes = []
+        for k in range(300):
+            x, y = rnd.uniform(-10, 10), rnd.uniform(-10, 10)
+            boxes.append((x, y, x + rnd.uniform(0, 2), y + rnd.uniform(0, 2),
+                          rnd.uniform(-1, 1)))
+        t = BVH(boxes)
+        self.assertGreater(len(t), 100)
+        for k in range(100):
+            beg = (rnd.uniform(-10, 10), rnd.uniform(-10, 10),
+                   rnd.uniform(-1, 1))
+            fin = (beg[0] + rnd.uniform(-5, 5), beg[1] + rnd.uniform(-5, 5),
+                   rnd.uniform(-1, 1))
+            expected = [
+                n for n, b in enumerate(boxes)
+                if b[4] > min(beg[2], fin[2]) and _crosses(
+                    b, beg[0], beg[1], fin[0] - beg[0], fin[1] - beg[1])]
+            self.assertEqual(sorted(t.query(beg, fin)), expected)
+
+    # Пересечение отрезка с прямоугольником; касание — тоже пересечение
+    def test_crosses01(self):
+        box = (0.0, 0.0, 1.0, 1.0)
+        self.assertTrue(_crosses(box, -1.0, 0.5, 3.0, 0.0))
+        self.assertTrue(_crosses(box, 1.0, -1.0, 0.0, 1.0))
+        self.assertFalse(_crosses(box, 1.5, 0.0, 1.0, 1.0))
+        self.assertFalse(_crosses(box, 0.0, 1.5, 1.0, 1.0))
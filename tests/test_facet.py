@@ -145,3 +145,9 @@ class TestVoid(unittest.TestCase):
         ])
         f.good_vertices_count = 3
         self.assertTrue(isclose(f.get_special_area(), 0.0))
+
+    # Число «хороших» вершин берётся из заранее вычисленных признаков
+    def test_good_vertices_count01(self):
+        f = Facet([R3(0.0, 0.0, 0.0), R3(2.0, 0.0, 0.0), R3(0.0, 2.0, 0.0)],
+                  [0, 1, 3], [True, False, True, True])
+        self.assertEqual(f.good_vertices_count, 2)
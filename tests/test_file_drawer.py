@@ -0,0 +1,128 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+from common.r3 import R3
+from common.tk_drawer import SIZE
+from common.file_drawer import FileDrawer, Scene, raster, rgb
+
+
+class TestFileDrawer(unittest.TestCase):
+
+    # Файлы изображений записываются во временный каталог
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # Имя файла во временном каталоге
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    # Цвета задаются именами Tk или в виде "#rrggbb"
+    def test_rgb01(self):
+        self.assertEqual(rgb("gray"), (190, 190, 190))
+        self.assertEqual(rgb("#0a0b0c"), (10, 11, 12))
+        with self.assertRaises(ValueError):
+            rgb("purple")
+
+    # Неизвестное расширение файла — ошибка
+    def test_format01(self):
+        with self.assertRaises(ValueError):
+            FileDrawer(self.path("image.jpg"))
+
+    # Отрезки, нарисованные по одному и массивом, хранятся одним элементом
+    def test_scene01(self):
+        tk = FileDrawer(self.path("image.svg"))
+        tk.clean()
+        tk.draw_line(R3(0.0, 0.0, 0.0), R3(1.0, 1.0, 1.0))
+        tk.draw_lines(np.zeros((10, 2, 3)))
+        kinds = [(k, len(rows)) for k, s, rows in tk.canvas.arrays()]
+        self.assertEqual(kinds, [("rectangle", 1), ("line", 11)])
+
+    # Ломаные запоминаются своими звеньями
+    def test_scene03(self):
+        tk = FileDrawer(self.path("image.svg"))
+        tk.canvas.create_line(0, 0, 1, 1, 2, 0)
+        tk.draw_polylines([np.zeros((4, 3)), np.zeros((2, 3))])
+        kinds = [(k, len(rows)) for k, s, rows in tk.canvas.arrays()]
+        self.assertEqual(kinds, [("line", 2), ("line", 4)])
+
+    # Стирание картинки забывает всё нарисованное ранее
+    def test_scene02(self):
+        s = Scene()
+        s.create_line(0, 0, 1, 1)
+        s.create_rectangle(0, 0, SIZE, SIZE)
+        self.assertEqual([k for k, s, rows in s.arrays()], ["rectangle"])
+
+    # Файл SVG содержит все отрезки и точки
+    def test_svg01(self):
+        tk = FileDrawer(self.path("image.svg"))
+        tk.clean()
+        tk.draw_lines(np.ones((5, 2, 3)))
+        tk.draw_point(R3(0.0, 0.0, 0.0), 0.0, 0.0, 0.0)
+        tk.close()
+        with open(tk.file) as f:
+            text = f.read()
+        self.assertTrue(text.startswith("<svg"))
+        self.assertEqual(text.count("<line"), 5)
+        self.assertEqual(text.count("<ellipse"), 1)
+
+    # Заголовок и размер файла PPM
+    def test_ppm01(self):
+        tk = FileDrawer(self.path("image.ppm"))
+        tk.clean()
+        tk.close()
+        with open(tk.file, "rb") as f:
+            data = f.read()
+        header = b"P6\n%d %d\n255\n" % (SIZE, SIZE)
+        self.assertTrue(data.startswith(header))
+        self.assertEqual(len(data), len(header) + 3 * SIZE * SIZE)
+
+    # Файл PNG распаковывается в то же изображение, что строит растеризатор
+    def test_png01(self):
+        tk = FileDrawer(self.path("image.png"))
+        tk.clean()
+        tk.draw_axes(30.0, 15.0, 45.0)
+        tk.draw_plane(30.0, 15.0, 45.0)
+        tk.close()
+        with open(tk.file, "rb") as f:
+            data = f.read()
+        self.assertEqual(data[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(struct.unpack(">II", data[16:24]), (SIZE, SIZE))
+        size = struct.unpack(">I", data[33:37])[0]
+        rows = np.frombuffer(zlib.decompress(data[41:41 + size]),
+                             dtype=np.uint8).reshape(SIZE, -1)
+        self.assertEqual(rows[:, 1:].tobytes(),
+                         raster(tk.canvas).tobytes())
+
+    # Пиксели отрезка закрашены по всей его длине
+    def test_raster01(self):
+        s = Scene()
+        s.create_line(10, 20, 110, 20, fill="red", width=1)
+        image = raster(s)
+        row = image[20, :, 0].astype(int) - image[20, :, 1]
+        self.assertEqual(np.flatnonzero(row).tolist(), list(range(10, 111)))
+        self.assertTrue((image[19] == 255).all())
+
+    # В пунктирном отрезке есть промежутки
+    def test_raster02(self):
+        s = Scene()
+        s.create_line(0, 5, 100, 5, width=1, dash=(4, 2))
+        dark = (raster(s)[5, :101, 0] == 0).tolist()
+        self.assertEqual(dark[:12], [True] * 4 + [False] * 2 +
+                         [True] * 4 + [False] * 2)
+
+    # Толстый отрезок и точка закрашивают соседние пиксели
+    def test_raster03(self):
+        s = Scene()
+        s.create_line(10, 10, 10, 30, width=3)
+        s.create_oval(45, 45, 55, 55, fill="blue")
+        image = raster(s)
+        self.assertTrue((image[10:31, 9:12] == 0).all())
+        self.assertEqual(image[50, 50].tolist(), [0, 0, 255])
+        self.assertEqual(image[50, 56].tolist(), [255, 255, 255])
@@ -0,0 +1,61 @@
+import unittest
+from random import Random
+
+from common.gaps import full, subtract, pairs
+from shadow.polyedr import Segment
+
+
+# Вычитание через список отрезков, как это делалось раньше
+def reference(gaps, beg, fin):
+    shade = Segment(beg, fin)
+    result = []
+    for s in gaps:
+        result.extend(t for t in s.subtraction(shade) if not t.is_degenerate())
+    return result
+
+
+class TestGaps(unittest.TestCase):
+
+    # Исходный «просвет» — весь отрезок
+    def test_full01(self):
+        self.assertEqual(list(full()), [0.0, 1.0])
+
+    # Тень внутри «просвета» разбивает его на два
+    def test_subtract01(self):
+        g = full()
+        subtract(g, 0.25, 0.5)
+        self.assertEqual(list(pairs(g)), [(0.0, 0.25), (0.5, 1.0)])
+
+    # Тень, покрывающая весь отрезок, не оставляет «просветов»
+    def test_subtract02(self):
+        g = full()
+        subtract(g, -1.0, 2.0)
+        self.assertEqual(len(g), 0)
+
+    # Тень, совпадающая с началом «просвета», не порождает вырожденных
+    def test_subtract03(self):
+        g = full()
+        subtract(g, 0.0, 0.5)
+        subtract(g, 0.75, 1.0)
+        self.assertEqual(list(pairs(g)), [(0.5, 0.75)])
+
+    # Тень между «просветами» ничего не меняет
+    def test_subtract04(self):
+        g = full()
+        subtract(g, 0.25, 0.5)
+        subtract(g, 0.3, 0.4)
+        subtract(g, 0.25, 0.5)
+        self.assertEqual(list(pairs(g)), [(0.0, 0.25), (0.5, 1.0)])
+
+    # Результат совпадает с вычитанием списков отрезков
+    def test_subtract05(self):
+        rnd = Random(1)
+        for _ in range(200):
+            g, ref = full(), [Segment(0.0, 1.0)]
+            for _ in range(8):
+                beg = rnd.choice([0.0, 0.25, 0.5, 1.0, rnd.uniform(-0.2, 1)])
+                fin = beg + rnd.choice([0.25, 0.5, rnd.uniform(0.01, 0.5)])
+                subtract(g, beg, fin)
+                ref = reference(ref, beg, fin)
+                self.assertEqual(list(pairs(g)),
+                                 [(s.beg, s.fin) for s in ref])
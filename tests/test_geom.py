@@ -0,0 +1,270 @@
+import os
+import unittest
+from math import pi
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from common import geom
+from common.cache import cache_path
+
+BOX = """200.0	45.0	45.0	30.0
+8	4	16
+-0.5	-0.5	0.5
+-0.5	0.5	0.5
+0.5	0.5	0.5
+0.5	-0.5	0.5
+-0.5	-0.5	-0.5
+-0.5	0.5	-0.5
+0.5	0.5	-0.5
+0.5	-0.5	-0.5
+4	5    6    2    1
+4	3    2    6    7
+4	3    7    8    4
+4	1    4    8    5
+"""
+
+CUBE = BOX.replace("8	4	16", "8	6	24") + \
+    "4	1    2    3    4\n4	8    7    6    5\n"
+
+
+class TestGeom(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.file = os.path.join(self.dir.name, 'box.geom')
+        with open(self.file, 'w') as f:
+            f.write(BOX)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # Грани хранятся как единый массив индексов и массив смещений
+    def test_parse01(self):
+        g = geom.load(self.file, cache=False)
+        self.assertEqual(g.points.shape, (8, 3))
+        self.assertEqual(g.offsets.tolist(), [0, 4, 8, 12, 16])
+        self.assertEqual(list(g.facet_indexes())[0], [4, 5, 1, 0])
+        self.assertFalse(os.path.exists(cache_path(self.file)))
+
+    # Прямоугольники и нормали граней
+    def test_boxes_normals01(self):
+        g = geom.load(self.file, cache=False)
+        self.assertEqual(g.boxes().shape, (4, 5))
+        self.assertTrue(np.all(g.normals()[:, 2] >= 0.0))
+        p = g.points[[4, 5, 1, 0]]
+        self.assertTrue(np.allclose(
+            g.boxes()[0], [p[:, 0].min(), p[:, 1].min(), p[:, 0].max(),
+                           p[:, 1].max(), p[:, 2].max()]))
+
+    # Площади проекций граней на плоскость Oxy
+    def test_areas01(self):
+        g = geom.load(self.file, cache=False)
+        areas = []
+        for ids in g.facet_indexes():
+            x, y = g.points[ids, 0], g.points[ids, 1]
+            areas.append(abs(np.dot(x, np.roll(y, -1)) -
+                             np.dot(y, np.roll(x, -1))) / 2)
+        self.assertTrue(np.allclose(g.areas(), areas))
+
+    # У незамкнутого полиэдра «задних» рёбер нет
+    def test_back_edges01(self):
+        g = geom.load(self.file, cache=False)
+        self.assertFalse(np.any(g.back_edges()))
+
+    # У куба «задние» рёбра — три общих ребра трёх повёрнутых от
+    # наблюдателя граней; обход граней в обратном порядке ничего не меняет
+    def test_back_edges02(self):
+        found = []
+        for facets in (CUBE, "\n".join(
+                "4\t" + "    ".join(reversed(line.split()[1:]))
+                if line.startswith("4\t") else line
+                for line in CUBE.split("\n"))):
+            with open(self.file, 'w') as f:
+                f.write(facets)
+            g = geom.load(self.file, cache=False)
+            pairs, facets = g.edges()
+            back = g.back_edges()
+            self.assertEqual(np.count_nonzero(back), 3)
+            self.assertEqual(len(set(facets[back].ravel().tolist())), 3)
+            found.append({frozenset(e) for e in pairs[back].tolist()})
+        self.assertEqual(found[0], found[1])
+
+    # Вершины из одного куба сетки объединяются, а выродившиеся грани
+    # отбрасываются
+    def test_cluster01(self):
+        g = geom.Geom(1.0, 0.0, 0.0, 0.0, np.array(
+            [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [1.0, 1.0, 0.0],
+             [0.0, 1.0, 0.0]]), np.array([0, 1, 2, 3, 0, 1, 3]),
+            np.array([0, 4, 7]), outward=np.array([1.0, 0.0]))
+        c = g.cluster(0.5)
+        self.assertEqual(c.points.tolist(), [
+            [0.05, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
+        self.assertEqual(c.indexes.tolist(), [0, 2, 1])
+        self.assertEqual(c.offsets.tolist(), [0, 3])
+        self.assertEqual(c.outward().tolist(), [1.0])
+        self.assertTrue(np.allclose(c.model(), c.points))
+
+    # При мелкой сетке полиэдр не меняется, а ориентация граней
+    # наследуется, хотя упрощённый полиэдр замкнутым не проверяется
+    def test_cluster02(self):
+        with open(self.file, 'w') as f:
+            f.write(CUBE)
+        g = geom.load(self.file, cache=False)
+        c = g.cluster(1e-6)
+        self.assertEqual(c.points[c.indexes].tolist(),
+                         g.points[g.indexes].tolist())
+        self.assertEqual(c.offsets.tolist(), g.offsets.tolist())
+        self.assertIsNotNone(c._outward)
+        self.assertEqual(c.back_edges().tolist(), g.back_edges().tolist())
+
+    # Повторная загрузка читает откомпилированный файл без копирования
+    def test_cache01(self):
+        g1 = geom.load(self.file)
+        self.assertTrue(os.path.exists(cache_path(self.file)))
+        g2 = geom.load(self.file)
+        self.assertFalse(g2.points.flags['WRITEABLE'])
+        self.assertTrue(np.array_equal(g1.points, g2.points))
+        self.assertTrue(np.array_equal(g1.indexes, g2.indexes))
+        self.assertTrue(np.array_equal(g1.boxes(), g2.boxes()))
+        self.assertTrue(np.array_equal(g1.normals(), g2.normals()))
+
+    # Изменение углов Эйлера в заголовке делает кэш недействительным
+    def test_cache02(self):
+        g1 = geom.load(self.file)
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('45.0	45.0', '10.0	45.0', 1))
+        g2 = geom.load(self.file)
+        self.assertFalse(np.allclose(g1.points, g2.points))
+        self.assertTrue(np.allclose(
+            g2.points, geom.load(self.file, cache=False).points))
+
+    # Центры граней и нормали к их «вертикальным» полупространствам
+    def test_centers01(self):
+        g = geom.load(self.file, cache=False)
+        centers = g.centers()
+        p = g.points[[4, 5, 1, 0]]
+        self.assertTrue(np.allclose(centers[0], p.mean(axis=0)))
+        n = g.v_normals()
+        self.assertEqual(n.shape, (16, 3))
+        self.assertTrue(np.all(n[:, 2] == 0.0))
+        w = p[[3, 0, 1, 2]] - centers[0]
+        self.assertTrue(np.all(np.einsum("ij,ij->i", n[:4], w) >= 0.0))
+
+    # Другая точка зрения: топология общая, а вершины совпадают с
+    # прочитанными из файла с другими коэффициентом и углами в заголовке
+    def test_view01(self):
+        g = geom.load(self.file)
+        v = g.view(100.0, 0.0, pi / 2, pi)
+        self.assertTrue(np.array_equal(v.model(), g.model()))
+        self.assertIs(v.edges(), g.edges())
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('200.0	45.0	45.0	30.0',
+                                '100.0	0.0	90.0	180.0', 1))
+        w = geom.load(self.file, cache=False)
+        self.assertTrue(np.array_equal(v.points, w.points))
+        self.assertTrue(np.array_equal(v.boxes(), w.boxes()))
+
+    # Повреждённый кэш игнорируется и перезаписывается
+    def test_cache03(self):
+        with open(cache_path(self.file), 'wb') as f:
+            f.write(b'garbage')
+        g = geom.load(self.file)
+        self.assertEqual(g.points.shape, (8, 3))
+        self.assertTrue(np.array_equal(geom.load(self.file).points, g.points))
+
+    # Число вершин во второй строке не согласуется с блоком вершин
+    def test_validate01(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('8	4	16', '9	4	16', 1))
+        with self.assertRaises(ValueError):
+            geom.load(self.file, cache=False)
+
+    # Число граней во второй строке не согласуется с блоком граней
+    def test_validate02(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('8	4	16', '8	5	16', 1))
+        with self.assertRaises(ValueError):
+            geom.load(self.file, cache=False)
+
+    # Число рёбер граней во второй строке не согласуется с гранями
+    def test_validate03(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('8	4	16', '8	4	15', 1))
+        with self.assertRaises(ValueError):
+            geom.load(self.file, cache=False)
+
+    # Номер вершины грани вне допустимого диапазона
+    def test_validate04(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('4	1    4    8    5', '4	1    4    9    5'))
+        with self.assertRaises(ValueError):
+            geom.load(self.file, cache=False)
+
+    # Грани с разным числом вершин
+    def test_parse02(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('8	4	16', '8	4	15', 1).replace(
+                '4	1    4    8    5', '3	1    4    8'))
+        g = geom.load(self.file, cache=False)
+        self.assertEqual(g.offsets.tolist(), [0, 4, 8, 12, 15])
+        self.assertEqual(list(g.facet_indexes())[3], [0, 3, 7])
+
+    # Потоковое чтение порциями даёт те же грани, что и обычное
+    def test_stream01(self):
+        g = geom.load(self.file, cache=False)
+        s = geom.stream(self.file, chunk=3)
+        self.assertTrue(np.allclose(s.points, g.points))
+        parts = list(s)
+        self.assertEqual([len(p) for p in parts], [3, 1])
+        self.assertEqual([p.first for p in parts], [0, 3])
+        self.assertTrue(np.array_equal(
+            np.concatenate([p.indexes for p in parts]), g.indexes))
+
+    # Рёбра выдаются без дубликатов по мере чтения граней
+    def test_stream02(self):
+        parts = list(geom.stream(self.file, chunk=1))
+        edges = np.concatenate([p.edges for p in parts])
+        self.assertEqual(len(edges), 12)
+        self.assertEqual(parts[0].edges.tolist(),
+                         [[0, 4], [4, 5], [5, 1], [1, 0]])
+        self.assertEqual(len(np.unique(geom.edge_keys(edges[:, 0],
+                                                      edges[:, 1]))), 12)
+
+    # Несогласованное число граней обнаруживается в конце потока
+    def test_stream03(self):
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('8	4	16', '8	5	16', 1))
+        with self.assertRaises(ValueError):
+            list(geom.stream(self.file))
+
+    # Рёбра без дубликатов в порядке первого появления
+    def test_edges01(self):
+        pairs, facets = geom.load(self.file, cache=False).edges()
+        self.assertEqual(len(pairs), 12)
+        self.assertEqual(pairs[:4].tolist(), [[0, 4], [4, 5], [5, 1], [1, 0]])
+        keys = geom.edge_keys(pairs[:, 0], pairs[:, 1])
+        self.assertEqual(len(np.unique(keys)), 12)
+
+    # Каждое ребро помнит обе смежные грани (или одну, если это край)
+    def test_edges02(self):
+        pairs, facets = geom.load(self.file, cache=False).edges()
+        adjacent = dict(zip(map(tuple, pairs.tolist()),
+                            map(tuple, facets.tolist())))
+        # ребро 1-5 — общее для граней 0 и 3
+        self.assertEqual(adjacent[(0, 4)], (0, 3))
+        # ребро 2-1 принадлежит лишь грани 0 (дна и крышки нет)
+        self.assertEqual(adjacent[(1, 0)], (0, -1))
+        # ребро 6-2 — общее для граней 0 и 1
+        self.assertEqual(adjacent[(5, 1)], (0, 1))
+
+    # Рёбра и смежность сохраняются в откомпилированном файле
+    def test_edges03(self):
+        g1 = geom.load(self.file)
+        g2 = geom.load(self.file)
+        self.assertIsNotNone(g2._edges)
+        self.assertTrue(np.array_equal(g1.edges()[1], g2.edges()[1]))
+
+    # Ключ ребра не зависит от его направления
+    def test_edge_keys01(self):
+        self.assertEqual(geom.edge_keys([3, 7], [7, 3]).tolist(),
+                         [(3 << 32) | 7] * 2)
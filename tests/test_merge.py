@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+from common.tk_drawer import SCALE
+from common.merge import merge_segments, polylines
+
+# Пиксель в координатах полиэдра
+PIXEL = 1.0 / SCALE
+
+
+# Массив отрезков из пар пар координат (x, y)
+def segments(*pairs):
+    return np.array(pairs, dtype=np.float64).reshape(-1, 2, 2)
+
+
+class TestMerge(unittest.TestCase):
+
+    # Касающиеся и перекрывающиеся отрезки одной прямой объединяются
+    def test_merge01(self):
+        s = segments(((0, 0), (10, 10)), ((20, 20), (10, 10)),
+                     ((15, 15), (30, 30)))
+        result, merged, dropped = merge_segments(s)
+        self.assertEqual((merged, dropped), (2, 0))
+        self.assertEqual(result.tolist(), [[[0, 0], [30, 30]]])
+
+    # Промежуток короче допуска закрывается, а длиннее — остаётся
+    def test_merge02(self):
+        s = segments(((0, 0), (10, 0)), ((10 + 0.2 * PIXEL, 0), (20, 0)),
+                     ((20 + 2 * PIXEL, 0), (30, 0)))
+        result, merged, dropped = merge_segments(s)
+        self.assertEqual(merged, 1)
+        self.assertEqual(sorted(result[:, :, 0].tolist()),
+                         [[0, 20], [20 + 2 * PIXEL, 30]])
+
+    # Параллельные и пересекающиеся отрезки не объединяются
+    def test_merge03(self):
+        s = segments(((0, 0), (10, 0)), ((0, 2 * PIXEL), (10, 2 * PIXEL)),
+                     ((5, -5), (5, 5)))
+        result, merged, dropped = merge_segments(s)
+        self.assertEqual((len(result), merged, dropped), (3, 0, 0))
+
+    # Отрезки короче пикселя отбрасываются и не объединяются с другими
+    def test_merge04(self):
+        s = segments(((0, 0), (10, 0)), ((20, 0), (20, 0)),
+                     ((30, 0), (30 + 0.1 * PIXEL, 0)))
+        result, merged, dropped = merge_segments(s)
+        self.assertEqual((merged, dropped), (0, 2))
+        self.assertEqual(result.tolist(), [[[0, 0], [10, 0]]])
+
+    # Пустой массив отрезков
+    def test_merge05(self):
+        result, merged, dropped = merge_segments(np.empty((0, 2, 3)))
+        self.assertEqual((result.shape, merged, dropped), ((0, 2, 3), 0, 0))
+
+    # Контур квадрата — одна замкнутая ломаная
+    def test_polylines01(self):
+        s = segments(((0, 0), (10, 0)), ((0, 10), (10, 10)),
+                     ((10, 0), (10, 10)), ((0, 0), (0, 10)))
+        lines = polylines(s)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(len(lines[0]), 5)
+        self.assertEqual(lines[0][0].tolist(), lines[0][-1].tolist())
+
+    # Каждый отрезок «звезды» входит ровно в одну ломаную
+    def test_polylines02(self):
+        rays = [((0, 0), (10 * np.cos(a), 10 * np.sin(a)))
+                for a in np.linspace(0.0, 6.0, 5)]
+        lines = polylines(segments(*rays))
+        links = sorted(sorted(map(tuple, np.round(v[k:k + 2], 9).tolist()))
+                       for v in lines for k in range(len(v) - 1))
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(links, sorted(
+            sorted(map(tuple, np.round(r, 9).tolist())) for r in rays))
@@ -0,0 +1,70 @@
+import unittest
+from math import floor, ceil
+from random import Random
+
+from common import nests
+
+
+# Номера гнёзд отрезка [t1, t2], как в методе Polyedr.to_range
+def to_range(t1, t2, step):
+    return range(floor(t1 / step), ceil(t2 / step) + 1)
+
+
+class TestNests(unittest.TestCase):
+
+    # Гнёзда прямоугольника перебираются по строкам
+    def test_cells01(self):
+        owner, i, j = nests.cells([(0.5, 0.5, 1.5, 0.5)], 1.0)
+        self.assertEqual(owner.tolist(), [0] * 6)
+        self.assertEqual(list(zip(i.tolist(), j.tolist())),
+                         [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)])
+
+    # Пустой набор прямоугольников
+    def test_cells02(self):
+        owner, i, j = nests.cells([], 1.0)
+        self.assertEqual(len(owner), 0)
+
+    # Пары прямоугольников с общими гнёздами совпадают с найденными
+    # перебором
+    def test_pairs01(self):
+        rnd = Random(1)
+
+        def box():
+            x, y = rnd.uniform(-5, 5), rnd.uniform(-5, 5)
+            return (x, y, x + rnd.uniform(0, 2), y + rnd.uniform(0, 2))
+
+        first = [box() for k in range(30)]
+        second = [box() for k in range(40)]
+        a, b = nests.pairs(first, second, 0.7)
+        expected = [
+            (p, q) for p, u in enumerate(first) for q, v in enumerate(second)
+            if set(to_range(u[0], u[2], 0.7)) & set(to_range(v[0], v[2], 0.7))
+            and set(to_range(u[1], u[3], 0.7)) &
+            set(to_range(v[1], v[3], 0.7))]
+        self.assertEqual(list(zip(a.tolist(), b.tolist())), expected)
+
+    # Обход гнёзд вдоль горизонтального отрезка в обратном направлении
+    def test_walk01(self):
+        self.assertEqual(list(nests.walk(3.5, 0.5, 0.5, 0.5, 1.0)),
+                         [(3, 0), (2, 0), (1, 0), (0, 0)])
+
+    # Отрезок внутри одного гнезда
+    def test_walk02(self):
+        self.assertEqual(list(nests.walk(-0.5, -0.2, -0.1, -0.9, 1.0)),
+                         [(-1, -1)])
+
+    # Обход проходит все гнёзда, через которые проходит отрезок, переходя
+    # каждый раз в соседнее гнездо
+    def test_walk03(self):
+        rnd = Random(2)
+        for k in range(100):
+            x0, y0, x1, y1 = (rnd.uniform(-5, 5) for n in range(4))
+            cells = list(nests.walk(x0, y0, x1, y1, 0.7))
+            self.assertEqual(cells[0], (floor(x0 / 0.7), floor(y0 / 0.7)))
+            self.assertEqual(cells[-1], (floor(x1 / 0.7), floor(y1 / 0.7)))
+            for (i, j), (p, q) in zip(cells, cells[1:]):
+                self.assertEqual(abs(i - p) + abs(j - q), 1)
+            for n in range(1, 200):
+                t = n / 200
+                x, y = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+                self.assertIn((floor(x / 0.7), floor(y / 0.7)), cells)
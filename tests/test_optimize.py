@@ -0,0 +1,225 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock
+
+from common.cache import step_path
+from optimize_7.polyedr import Polyedr, tune_step
+from tests.test_geom import BOX, CUBE
+
+
+class TestOptimize(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.file = os.path.join(self.dir.name, 'box.geom')
+        with open(self.file, 'w') as f:
+            f.write(BOX)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # «Просветы» после оптимизации и удаления невидимых линий
+    def gaps(self, **options):
+        p = Polyedr(self.file)
+        p.optimize()
+        p.shadow(**options)
+        return [list(e.flat_gaps) for e in p.edges]
+
+    # Все способы учёта теней дают одинаковые «просветы»
+    def test_engines01(self):
+        gaps = self.gaps()
+        self.assertEqual(self.gaps(engine="vector"), gaps)
+        self.assertEqual(self.gaps(engine="bulk"), gaps)
+
+    # Неизвестный способ учёта теней
+    def test_engines02(self):
+        with self.assertRaises(ValueError):
+            self.gaps(engine="magic")
+
+    # Параллельное удаление невидимых линий даёт те же «просветы»
+    def test_processes01(self):
+        gaps = self.gaps()
+        self.assertEqual(self.gaps(processes=2), gaps)
+        self.assertEqual(self.gaps(engine="bulk", processes=3), gaps)
+
+    # Поиск граней-кандидатов в дереве квадрантов
+    def test_quadtree01(self):
+        p = Polyedr(self.file)
+        p.optimize("quadtree")
+        p.shadow()
+        self.assertEqual([list(e.flat_gaps) for e in p.edges], self.gaps())
+        self.assertGreater(p.tested, 0)
+
+    # Неизвестный способ поиска граней-кандидатов
+    def test_quadtree02(self):
+        with self.assertRaises(ValueError):
+            Polyedr(self.file).optimize("octree")
+
+    # Поиск граней-кандидатов в иерархии прямоугольников
+    def test_bvh01(self):
+        p = Polyedr(self.file)
+        p.optimize("bvh")
+        p.shadow("vector")
+        self.assertEqual([list(e.flat_gaps) for e in p.edges], self.gaps())
+
+    # Поиск граней-кандидатов обходом гнёзд вдоль рёбер
+    def test_walk01(self):
+        p = Polyedr(self.file)
+        p.optimize("walk")
+        p.shadow()
+        self.assertEqual([list(e.flat_gaps) for e in p.edges], self.gaps())
+
+    # Размер гнёзд не зависит от случая и может быть задан явно
+    def test_step01(self):
+        p, q = Polyedr(self.file), Polyedr(self.file)
+        p.optimize()
+        q.optimize()
+        self.assertEqual(p.step, q.step)
+        q.optimize(step=0.25)
+        self.assertEqual(q.step, 0.25)
+
+    # Подобранный размер гнёзд сохраняется рядом с файлом полиэдра и
+    # используется по умолчанию, пока файл не изменится
+    def test_tune01(self):
+        step, timings = tune_step(self.file, factors=(0.5, 1.0))
+        self.assertIn(step, [s for s, t in timings])
+        self.assertTrue(os.path.exists(step_path(self.file)))
+        p = Polyedr(self.file)
+        p.optimize()
+        self.assertEqual(p.step, step)
+        with open(self.file, 'a') as f:
+            f.write('\n')
+        self.assertIsNone(Polyedr(self.file).saved_step())
+
+    # Порядок перебора граней-кандидатов не меняет «просветов»
+    def test_order01(self):
+        gaps = self.gaps()
+        self.assertEqual(self.gaps(order="depth"), gaps)
+        self.assertEqual(self.gaps(order="area", processes=2), gaps)
+        with self.assertRaises(ValueError):
+            self.gaps(order="random")
+
+    # Счётчики проверок для полностью невидимых рёбер
+    def test_order02(self):
+        p = Polyedr(self.file)
+        p.optimize()
+        p.shadow(order="depth")
+        hidden = sum(len(e.flat_gaps) == 0 for e in p.edges)
+        self.assertEqual(p.hidden, hidden)
+        self.assertLessEqual(p.hidden_tested, p.tested)
+        self.assertGreaterEqual(p.hidden_tested, p.hidden)
+
+    # Отсечение «задних» рёбер куба: остальные «просветы» не меняются, а
+    # у отсечённых рёбер и без отсечения остаются лишь следы погрешностей
+    def test_cull01(self):
+        with open(self.file, 'w') as f:
+            f.write(CUBE)
+        p = Polyedr(self.file)
+        p.optimize(cull=False)
+        self.assertEqual(p.culled, 0)
+        full = [list(e.flat_gaps) for e in p.shadow().edges]
+        p = Polyedr(self.file)
+        p.optimize()
+        self.assertEqual(p.culled, 3)
+        self.assertEqual(p.culled + p.shadow().hidden,
+                         sum(len(e.flat_gaps) == 0 for e in p.edges))
+        for e, gaps in zip(p.edges, full):
+            if len(e.flat_gaps) > 0:
+                self.assertEqual(list(e.flat_gaps), gaps)
+            else:
+                self.assertLess(sum(gaps[1::2]) - sum(gaps[::2]), 1e-9)
+
+    # Смежные с ребром грани пропускаются без проверок, а «просветы» от
+    # этого не меняются
+    def test_own01(self):
+        p, q = Polyedr(self.file), Polyedr(self.file)
+        p.optimize()
+        q.optimize()
+        for e in q.edges:
+            e.facets = None
+        p.shadow()
+        q.shadow()
+        self.assertEqual([list(e.flat_gaps) for e in p.edges],
+                         [list(e.flat_gaps) for e in q.edges])
+        self.assertLess(p.tested, q.tested)
+
+    # Смена точки зрения даёт те же «просветы», что и загрузка файла с
+    # другими углами в заголовке, а возврат к исходной — прежние
+    def test_view01(self):
+        gaps = self.gaps()
+        p = Polyedr(self.file)
+        p.optimize()
+        edges = p.edges
+        p.view(200.0, 10.0, 20.0, 30.0)
+        self.assertIs(p.edges, edges)
+        p.shadow()
+        view = [list(e.flat_gaps) for e in p.edges]
+        p.view(200.0, 45.0, 45.0, 30.0)
+        p.shadow()
+        self.assertEqual([list(e.flat_gaps) for e in p.edges], gaps)
+        with open(self.file, 'w') as f:
+            f.write(BOX.replace('45.0	45.0	30.0', '10.0	20.0	30.0', 1))
+        self.assertEqual(self.gaps(), view)
+
+    # Видимые отрезки лежат на рёбрах и соответствуют «просветам»
+    def test_segments01(self):
+        p = Polyedr(self.file)
+        p.optimize()
+        p.shadow()
+        segments = p.segments()
+        expected = [(e.r3(b), e.r3(f)) for e in p.edges
+                    for b, f in zip(e.flat_gaps[::2], e.flat_gaps[1::2])]
+        self.assertEqual(segments.shape, (len(expected), 2, 3))
+        self.assertEqual(segments.tolist(), [
+            [[u.x, u.y, u.z], [v.x, v.y, v.z]] for u, v in expected])
+
+    # Кадры поворота совпадают с изображениями, построенными для каждой
+    # точки зрения отдельно, хотя грани-подсказки меняют порядок проверок
+    def test_turntable01(self):
+        views = [(200.0, a, 45.0, 30.0) for a in range(0, 90, 15)]
+        p = Polyedr(self.file)
+        p.optimize()
+        for view, segments in zip(views, p.turntable(views)):
+            q = Polyedr(self.file)
+            q.optimize()
+            q.view(*view)
+            self.assertEqual(segments.tolist(), q.shadow().segments().tolist())
+
+    # Изображение рисуется ломаными, в которые входят все видимые отрезки
+    def test_draw01(self):
+        p = Polyedr(self.file)
+        p.optimize()
+        p.shadow()
+        tk = Mock()
+        p.draw(tk)
+        lines = tk.draw_polylines.call_args[0][0]
+        self.assertEqual(p.drawn, len(lines))
+        self.assertEqual(sum(len(v) - 1 for v in lines) + p.merged +
+                         p.dropped, len(p.segments()))
+        self.assertLess(len(lines), len(p.segments()))
+        tk.draw_lines.assert_not_called()
+        p.draw(tk, merge=False)
+        tk.draw_lines.assert_called_once()
+
+    # Упрощённый полиэдр с мелкой сеткой даёт то же изображение
+    def test_lod01(self):
+        p = Polyedr(self.file)
+        p.optimize()
+        coarse = p.lod(1e-9)
+        self.assertIsNone(coarse.file)
+        self.assertEqual(coarse.options, p.options)
+        self.assertEqual(coarse.shadow().segments().tolist(),
+                         p.shadow().segments().tolist())
+        self.assertLess(len(p.lod(3.0).vertexes), len(p.vertexes))
+
+    # Постепенное уточнение завершается изображением самого полиэдра
+    def test_progressive01(self):
+        p = Polyedr(self.file)
+        p.optimize()
+        tk = Mock()
+        drawn = list(p.progressive(tk, levels=(0.5, 0.1)))
+        self.assertEqual(len(drawn), 3)
+        self.assertIs(drawn[-1], p)
+        self.assertEqual(tk.draw_polylines.call_count, 3)
+        self.assertEqual(tk.flush.call_count, 3)
@@ -23,7 +23,7 @@ class TestPolyedr(unittest.TestCase):
 4	3    7    8    4
 4	1    4    8    5"""
         fake_file_path = 'data/holey_box.geom'
-        with patch('shadow.polyedr.open'.format(__name__),
+        with patch('common.geom.open',
                    new=mock_open(read_data=fake_file_content)) as _file:
             self.polyedr = Polyedr(fake_file_path)
             _file.assert_called_once_with(fake_file_path)
@@ -39,3 +39,15 @@ class TestPolyedr(unittest.TestCase):
 
     def test_calculate_special_area(self):
         self.assertAlmostEqual(self.polyedr.calculate_special_area(), 4.0)
+
+    # Вершины полиэдра хранятся в едином массиве
+    def test_store(self):
+        self.assertEqual(self.polyedr.store.points.shape, (8, 3))
+        self.assertIs(self.polyedr.vertexes[0], self.polyedr.store[0])
+
+    # Грани и рёбра хранят индексы своих вершин
+    def test_indexes(self):
+        self.assertEqual(self.polyedr.facets[0].indexes, [4, 5, 1, 0])
+        self.assertEqual(self.polyedr.edges[0].indexes, (0, 4))
+        e = self.polyedr.edges[5]
+        self.assertIs(e.beg, self.polyedr.vertexes[e.indexes[0]])
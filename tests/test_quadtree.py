@@ -0,0 +1,47 @@
+import unittest
+from random import Random
+
+from common.quadtree import QuadTree
+
+
+# Случайные прямоугольники разных размеров
+def boxes(rnd, count):
+    result = []
+    for k in range(count):
+        x, y = rnd.uniform(-10, 10), rnd.uniform(-10, 10)
+        size = rnd.choice([0.1, 1.0, 5.0])
+        result.append((x, y, x + rnd.uniform(0, size),
+                       y + rnd.uniform(0, size)))
+    return result
+
+
+class TestQuadTree(unittest.TestCase):
+
+    # Пустое дерево ничего не находит
+    def test_query01(self):
+        t = QuadTree([])
+        self.assertEqual(t.query(-1.0, -1.0, 1.0, 1.0), [])
+        self.assertEqual(len(t), 1)
+
+    # Касающиеся прямоугольники считаются пересекающимися
+    def test_query02(self):
+        t = QuadTree([(0.0, 0.0, 1.0, 1.0), (2.0, 2.0, 3.0, 3.0)])
+        self.assertEqual(t.query(1.0, 1.0, 1.5, 1.5), [0])
+
+    # Запросы совпадают с перебором всех прямоугольников
+    def test_query03(self):
+        rnd = Random(1)
+        items = boxes(rnd, 300)
+        t = QuadTree(items, capacity=4)
+        self.assertGreater(len(t), 1)
+        for xmin, ymin, xmax, ymax in boxes(rnd, 100):
+            expected = [k for k, b in enumerate(items)
+                        if b[0] <= xmax and b[2] >= xmin and
+                        b[1] <= ymax and b[3] >= ymin]
+            self.assertEqual(sorted(t.query(xmin, ymin, xmax, ymax)),
+                             expected)
+
+    # Совпадающие прямоугольники не приводят к бесконечному делению
+    def test_depth01(self):
+        t = QuadTree([(0.0, 0.0, 0.0, 0.0)] * 20, capacity=2, depth=5)
+        self.assertEqual(len(t.query(0.0, 0.0, 0.0, 0.0)), 20)
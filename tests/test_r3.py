@@ -1,7 +1,8 @@
 import unittest
 
 from math import pi
-from common.r3 import R3
+from common.r3 import R3, transform_points, untransform_points, \
+    distances_to_plane, good_points
 from tests.matchers import R3ApproxMatcher
 
 
@@ -154,3 +155,55 @@ class TestR3(unittest.TestCase):
     def test_length03(self):
         point = R3(1.0, 2.0, 2.0)
         self.assertEqual(point.length(), 3.0)
+
+    # Матрица поворота совпадает с последовательностью поворотов rz, ry, rz
+    def test_transform01(self):
+        alpha, beta, gamma = 0.3, -1.2, 2.5
+        self.assertEqual(
+            R3ApproxMatcher(self.a.rz(alpha).ry(beta).rz(gamma) * 2.0),
+            self.a.transform(alpha, beta, gamma, 2.0))
+
+    # Преобразование untransform обратно к transform
+    def test_transform02(self):
+        b = self.a.transform(0.3, -1.2, 2.5, 7.0)
+        self.assertEqual(R3ApproxMatcher(self.a),
+                         b.untransform(0.3, -1.2, 2.5, 7.0))
+
+    # Пакетное преобразование массива точек совпадает с поточечным
+    def test_transform_points01(self):
+        points = [(1.0, 2.0, 3.0), (-4.0, 0.5, 2.0)]
+        result = transform_points(points, 0.3, -1.2, 2.5, 7.0)
+        for p, q in zip(points, result.tolist()):
+            self.assertEqual(R3ApproxMatcher(R3(*p).transform(
+                0.3, -1.2, 2.5, 7.0)), R3(*q))
+
+    # Пакетное обратное преобразование
+    def test_untransform_points01(self):
+        points = [(1.0, 2.0, 3.0), (-4.0, 0.5, 2.0)]
+        result = untransform_points(
+            transform_points(points, 0.3, -1.2, 2.5, 7.0),
+            0.3, -1.2, 2.5, 7.0)
+        for p, q in zip(points, result.tolist()):
+            self.assertEqual(R3ApproxMatcher(R3(*p)), R3(*q))
+
+    # Пакетное вычисление расстояний до плоскости y = -1
+    def test_distances_to_plane01(self):
+        points = transform_points([(0.0, 2.0, 0.0), (5.0, -1.5, 1.0)],
+                                  0.3, -1.2, 2.5, 7.0)
+        result = distances_to_plane(points, 0.3, -1.2, 2.5, 7.0)
+        self.assertAlmostEqual(result[0], 3.0)
+        self.assertAlmostEqual(result[1], 0.5)
+
+    # Неверно выбранная ось (плоскость) при пакетном вычислении
+    def test_distances_to_plane02(self):
+        with self.assertRaises(ValueError):
+            distances_to_plane([(0.0, 0.0, 0.0)], 0.0, 0.0, 0.0, 1.0,
+                               axis='invalid')
+
+    # Пакетная классификация совпадает с поточечной
+    def test_good_points01(self):
+        points = [R3(0.0, 3.0, 0.0), R3(0.0, 0.0, 0.0), R3(1.0, -3.5, 2.0)]
+        result = good_points([(p.x, p.y, p.z) for p in points],
+                             0.3, -1.2, 2.5, 7.0)
+        self.assertEqual(result.tolist(), [
+            p.is_good_point(0.3, -1.2, 2.5, 7.0) for p in points])
@@ -0,0 +1,105 @@
+import unittest
+from random import Random
+
+import numpy as np
+from common.r3 import R3
+from common.gaps import full, subtract
+from common.shade import FacetBlock, edge_shades, pair_shades, \
+    shades_gaps, clip
+from optimize_7.polyedr import Edge, Facet
+
+
+# Предкомпилированная грань
+def facet(*vertexes):
+    f = Facet(list(vertexes))
+    f.precompile()
+    return f
+
+
+SQUARE = facet(R3(0.0, 0.0, 0.0), R3(2.0, 0.0, 0.0),
+               R3(2.0, 2.0, 0.0), R3(0.0, 2.0, 0.0))
+TRIANGLE = facet(R3(0.0, 0.0, 1.0), R3(1.0, 0.0, 1.0), R3(0.0, 1.0, 1.0))
+WALL = facet(R3(0.0, 0.0, 0.0), R3(0.0, 0.0, 1.0),
+             R3(0.0, 1.0, 1.0), R3(0.0, 1.0, 0.0))
+
+
+class TestShade(unittest.TestCase):
+
+    # Строки блока дополняются полупространствами без ограничений
+    def test_block01(self):
+        b = FacetBlock([SQUARE, TRIANGLE])
+        self.assertEqual(len(b), 2)
+        self.assertEqual(b.normals.shape, (2, 5, 3))
+        self.assertEqual(b.bias.tolist(), [[0.0] * 5, [0.0] * 4 + [-1.0]])
+        self.assertEqual(b.zmax.tolist(), [0.0, 1.0])
+
+    # «Вертикальные» грани отмечаются в блоке
+    def test_block02(self):
+        b = FacetBlock([SQUARE, WALL])
+        self.assertEqual(b.vertical.tolist(), [False, True])
+
+    # Пересечения ребра с полупространствами f < 0
+    def test_clip01(self):
+        lo, hi = clip(np.array([-1.0, 1.0, -1.0, 1.0]),
+                      np.array([-1.0, 1.0, 1.0, -3.0]))
+        self.assertEqual(lo.tolist(), [0.0, 1.0, 0.0, 0.25])
+        self.assertEqual(hi.tolist(), [1.0, 0.0, 0.5, 1.0])
+
+    # Грань полностью затеняет ребро, расположенное под этой гранью
+    def test_edge_shades01(self):
+        b = FacetBlock([SQUARE])
+        lo, hi = edge_shades(b, (0.0, 0.0, -1.0), (1.0, 1.0, -1.0), [0])
+        self.assertEqual((lo.tolist(), hi.tolist()), ([0.0], [1.0]))
+
+    # «Вертикальная» и «низкая» грани не затеняют ничего
+    def test_edge_shades02(self):
+        b = FacetBlock([SQUARE, WALL])
+        lo, hi = edge_shades(b, (0.0, 0.0, 1.0), (1.0, 1.0, 1.0), [0, 1])
+        self.assertEqual(len(lo), 0)
+
+    # «Просветы» совпадают с найденными методом Edge.shadow грань за гранью
+    def test_edge_shades03(self):
+        rnd = Random(1)
+        facets = [facet(*(R3(rnd.uniform(-1, 1), rnd.uniform(-1, 1),
+                             rnd.uniform(-1, 1)) for k in range(n)))
+                  for n in [3, 4, 3, 5] * 5]
+        b = FacetBlock(facets)
+        for k in range(50):
+            e = Edge(R3(rnd.uniform(-1, 1), rnd.uniform(-1, 1), -1.0),
+                     R3(rnd.uniform(-1, 1), rnd.uniform(-1, 1), 1.0))
+            lo, hi = edge_shades(b, (e.beg.x, e.beg.y, e.beg.z),
+                                 (e.fin.x, e.fin.y, e.fin.z),
+                                 range(len(facets)))
+            v = full()
+            for s, t in zip(lo.tolist(), hi.tolist()):
+                subtract(v, s, t)
+            for f in facets:
+                e.shadow(f)
+            self.assertEqual(v, e.flat_gaps)
+
+    # Тени для пар (ребро, грань) совпадают с тенями отдельных рёбер
+    def test_pair_shades01(self):
+        b = FacetBlock([TRIANGLE, SQUARE])
+        beg = np.array([[0.0, 0.0, -1.0], [-5.0, -5.0, -1.0]])
+        fin = np.array([[1.0, 1.0, -1.0], [3.0, 3.0, -1.0]])
+        e, lo, hi = pair_shades(b, beg, fin, np.array([0, 1, 1]),
+                                np.array([1, 0, 1]))
+        self.assertEqual(sorted(zip(e.tolist(), lo.tolist(), hi.tolist())),
+                         [(0, 0.0, 1.0), (1, 0.625, 0.6875),
+                          (1, 0.625, 0.875)])
+
+    # Тени ребра объединяются, а «просветы» дополняют их до [0, 1]
+    def test_shades_gaps01(self):
+        shaded, starts, flat = shades_gaps(
+            np.array([2, 0, 2, 2, 0]), np.array([0.5, 0.0, 0.1, 0.2, 0.3]),
+            np.array([0.6, 0.3, 0.3, 0.25, 1.0]))
+        self.assertEqual(shaded.tolist(), [0, 2])
+        self.assertEqual(starts.tolist(), [0, 0, 6])
+        self.assertEqual(flat.tolist(), [0.0, 0.1, 0.3, 0.5, 0.6, 1.0])
+
+    # Пустой список теней
+    def test_shades_gaps02(self):
+        shaded, starts, flat = shades_gaps(
+            np.empty(0, dtype=int), np.empty(0), np.empty(0))
+        self.assertEqual((len(shaded), starts.tolist(), len(flat)),
+                         (0, [0], 0))
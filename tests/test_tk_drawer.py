@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from common.r3 import R3
+from common.tk_drawer import TkDrawer, CHUNK, screen_segments, x, y
+
+
+class TestTkDrawer(unittest.TestCase):
+
+    # Окно и холст подменяются, так что дисплей не нужен
+    def setUp(self):
+        with patch("common.tk_drawer.Tk"), patch("common.tk_drawer.Canvas"):
+            self.tk = TkDrawer()
+
+    # Экранные координаты концов отрезков, заданных массивом и парами точек
+    def test_screen01(self):
+        p, q = R3(1.0, 2.0, 3.0), R3(-4.0, 5.0, -6.0)
+        expected = [[x(p), y(p), x(q), y(q)]]
+        self.assertEqual(screen_segments([(p, q)]).tolist(), expected)
+        self.assertEqual(screen_segments(np.array(
+            [[[1.0, 2.0, 3.0], [-4.0, 5.0, -6.0]]])).tolist(), expected)
+        self.assertEqual(screen_segments([]).shape, (0, 4))
+
+    # Отрезки рисуются массивом без обновления окна после каждого из них
+    def test_draw_lines01(self):
+        with patch("common.tk_drawer.REFRESH", 3600.0):
+            self.tk.draw_lines(np.zeros((1000, 2, 3)))
+        self.assertEqual(self.tk.canvas.create_line.call_count, 1000)
+        self.tk.root.update.assert_not_called()
+        self.tk.flush()
+        self.tk.root.update.assert_called_once()
+
+    # Без ограничения частоты окно обновляется после каждой порции
+    def test_draw_lines02(self):
+        with patch("common.tk_drawer.REFRESH", 0.0):
+            self.tk.draw_lines(np.zeros((2 * CHUNK + 1, 2, 3)))
+        self.assertEqual(self.tk.root.update.call_count, 3)
+
+    # Точки, нарисованные массивом, окрашены так же, как по одной
+    def test_draw_points01(self):
+        points = [R3(0.0, 0.0, 0.0), R3(0.0, -1.0, 0.0), R3(3.0, 4.0, 5.0)]
+        angles = (0.1, 0.2, 0.3, 1.5)
+        for p in points:
+            self.tk.draw_point(p, *angles)
+        single = self.tk.canvas.create_oval.call_args_list
+        self.tk.canvas.create_oval.reset_mock()
+        self.tk.draw_points(points, *angles)
+        self.assertEqual(self.tk.canvas.create_oval.call_args_list, single)
+
+    # Каждая ломаная рисуется одним элементом холста
+    def test_draw_polylines01(self):
+        lines = [np.zeros((5, 3)), np.ones((2, 3))]
+        self.tk.draw_polylines(lines)
+        calls = self.tk.canvas.create_line.call_args_list
+        self.assertEqual([len(c[0]) for c in calls], [10, 4])
@@ -0,0 +1,35 @@
+import unittest
+
+from common.r3 import R3
+from common.vertexes import VertexStore
+from tests.matchers import R3ApproxMatcher
+
+
+class TestVertexStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = VertexStore([(0.0, 0.0, 0.0), (1.0, 2.0, 3.0),
+                                  (-1.0, 0.5, 2.0)])
+
+    # Вершины хранятся в едином массиве N×3
+    def test_points01(self):
+        self.assertEqual(self.store.points.shape, (3, 3))
+        self.assertTrue(self.store.points.flags['C_CONTIGUOUS'])
+
+    def test_len01(self):
+        self.assertEqual(len(self.store), 3)
+
+    # Представление вершины в виде R3 совпадает со строкой массива
+    def test_getitem01(self):
+        self.assertIsInstance(self.store[1], R3)
+        self.assertEqual(R3ApproxMatcher(self.store[1]), R3(1.0, 2.0, 3.0))
+
+    # Представления R3 строятся один раз и затем переиспользуются
+    def test_r301(self):
+        self.assertIs(self.store.r3(), self.store.r3())
+        self.assertIs(self.store[2], self.store.r3()[2])
+
+    # Выборка координат по индексам
+    def test_take01(self):
+        self.assertEqual(self.store.take([2, 0]).tolist(),
+                         [[-1.0, 0.5, 2.0], [0.0, 0.0, 0.0]])